@@ -1,67 +1,117 @@
+import time
+_START = time.perf_counter()
+
+import json
+import os
+import queue
+import sys
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk
 from datetime import datetime
+_TK_IMPORTED = time.perf_counter()
+
+from billing import BillingEngine
+from catalog import CatalogWatcher
+from instrumentation import TRACER, DebugPanel, install_tk_hook, traced
+from io_worker import IOWorker
+from journal import InvoiceJournal, invoice_record, render_record
+from menu_search import MenuSearchIndex
+from menu_view import VirtualMenuList, build_rows
+from order import format_cents
+from order_panel import OrderPanel
+from plu import PLUIndex
+from store import OrderStore
+from toast import Toaster
+_APP_IMPORTED = time.perf_counter()
+
+# Invoices that could not be saved before closing; re-submitted on the next start
+UNSAVED_PATH = "unsaved_invoices.jsonl"
+MENU_POLL_MS = 5000  # Thin clients ask the server for menu changes this often
+
+
+# --- Startup Profiling ---
+class StartupProfile:
+    """Checkpoint timings for --profile-startup; mark() is a no-op when disabled."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.marks = [("import tkinter", _TK_IMPORTED), ("import app modules", _APP_IMPORTED)]
+
+    def mark(self, label):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter()))
+
+    def report(self):
+        if not self.enabled:
+            return
+        lines = ["--- Startup profile (ms) ---"]
+        previous = _START
+        for label, t in self.marks:
+            lines.append(f"{label:<28}{(t - previous) * 1000:>8.1f}")
+            previous = t
+        lines.append(f"{'total':<28}{(previous - _START) * 1000:>8.1f}")
+        # The windowed (console=False) build has no stderr; write a file instead
+        if sys.stderr:
+            print("\n".join(lines), file=sys.stderr)
+        else:
+            with open("startup_profile.txt", "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+def show_splash(root):
+    """Borderless "loading" window shown while the main window is built."""
+    splash = tk.Toplevel(root)
+    splash.overrideredirect(True)
+    tk.Label(splash, text="Café Delight\nLoading…", font=("Georgia", 18, "bold"),
+             fg="#8B4513", bg="#F8F8F8", padx=40, pady=30).pack()
+    splash.update_idletasks()
+    x = (splash.winfo_screenwidth() - splash.winfo_reqwidth()) // 2
+    y = (splash.winfo_screenheight() - splash.winfo_reqheight()) // 2
+    splash.geometry(f"+{x}+{y}")
+    splash.update()
+    return splash
 
-# --- Menu Items ---
-menu = {
-    "Bruschetta": 6.50, "Mozzarella Sticks": 7.25, "Chicken Wings": 9.50, "Spring Rolls": 5.75,
-    "Garlic Bread": 4.50, "Stuffed Mushrooms": 8.00, "Calamari Fritti": 9.25, "Nachos Supreme": 8.75,
-    "Spinach Artichoke Dip": 7.50, "Shrimp Cocktail": 10.00, "Potato Skins": 6.75, "Hummus Platter": 6.25,
-    "Fried Pickles": 5.50, "Cheese Platter": 12.00, "Onion Rings": 4.75, "Caesar Salad": 6.75,
-    "Greek Salad": 7.00, "Cobb Salad": 8.50, "Caprese Salad": 7.25, "House Salad": 5.50,
-    "Waldorf Salad": 7.75, "Spinach Salad": 6.50, "Kale Quinoa Salad": 8.00, "Arugula Pear Salad": 7.50,
-    "Chef's Salad": 9.00, "Classic Cheeseburger": 8.99, "Bacon BBQ Burger": 10.50, "Veggie Burger": 8.25,
-    "Grilled Chicken Sandwich": 9.00, "Philly Cheesesteak": 10.25, "BLT Sandwich": 7.50,
-    "Turkey Club": 8.75, "Pulled Pork Sandwich": 9.25, "Fish Tacos": 10.00, "Portobello Mushroom Burger": 8.50,
-    "Margherita Pizza": 12.50, "Pepperoni Pizza": 13.75, "Supreme Pizza": 15.00, "Veggie Pizza": 13.25,
-    "Hawaiian Pizza": 14.00, "Buffalo Chicken Pizza": 14.50, "White Pizza": 13.00, "Spaghetti Carbonara": 14.25,
-    "Fettuccine Alfredo": 13.50, "Penne Arrabbiata": 12.75, "Lasagna": 15.50, "Pesto Pasta": 13.25,
-    "Seafood Linguine": 16.75, "Ravioli with Marinara": 14.00, "Grilled Salmon": 18.50,
-    "Chicken Parmesan": 15.75, "Beef Stir-Fry": 14.50, "Roasted Lamb Chops": 22.00, "Pork Tenderloin": 16.25,
-    "Vegetable Curry": 13.00, "Steak Ribeye": 24.00, "BBQ Ribs": 19.50, "Tofu Stir-Fry": 12.75,
-    "Shrimp Scampi": 17.50, "French Fries": 3.50, "Sweet Potato Fries": 4.25, "Mashed Potatoes": 3.75,
-    "Coleslaw": 2.75, "Steamed Broccoli": 3.25, "Garlic Mashed Cauliflower": 4.00, "Mac and Cheese": 4.50,
-    "Sauteed Spinach": 3.50, "Roasted Veggies": 4.00, "Chocolate Lava Cake": 6.50, "New York Cheesecake": 6.00,
-    "Tiramisu": 6.75, "Apple Pie": 5.50, "Creme Brulee": 6.25, "Ice Cream Sundae": 4.50, "Brownie": 4.00,
-    "Key Lime Pie": 5.75, "Soda": 2.50, "Iced Tea": 2.75, "Lemonade": 3.00, "Coffee": 2.25,
-    "Espresso": 3.50, "Bottled Water": 2.00, "Orange Juice": 3.25, "Milkshake": 4.75, "Smoothie": 5.00
-}
-
-# --- Categories ---
-categories = {
-    "Appetizers": ["Bruschetta", "Mozzarella Sticks", "Chicken Wings", "Spring Rolls", "Garlic Bread",
-                   "Stuffed Mushrooms", "Calamari Fritti", "Nachos Supreme", "Spinach Artichoke Dip",
-                   "Shrimp Cocktail", "Potato Skins", "Hummus Platter", "Fried Pickles", "Cheese Platter",
-                   "Onion Rings"],
-    "Salads": ["Caesar Salad", "Greek Salad", "Cobb Salad", "Caprese Salad", "House Salad",
-               "Waldorf Salad", "Spinach Salad", "Kale Quinoa Salad", "Arugula Pear Salad", "Chef's Salad"],
-    "Burgers and Sandwiches": ["Classic Cheeseburger", "Bacon BBQ Burger", "Veggie Burger",
-                               "Grilled Chicken Sandwich", "Philly Cheesesteak", "BLT Sandwich",
-                               "Turkey Club", "Pulled Pork Sandwich", "Fish Tacos", "Portobello Mushroom Burger"],
-    "Pizzas": ["Margherita Pizza", "Pepperoni Pizza", "Supreme Pizza", "Veggie Pizza",
-               "Hawaiian Pizza", "Buffalo Chicken Pizza", "White Pizza"],
-    "Pastas": ["Spaghetti Carbonara", "Fettuccine Alfredo", "Penne Arrabbiata", "Lasagna",
-               "Pesto Pasta", "Seafood Linguine", "Ravioli with Marinara"],
-    "Entrees": ["Grilled Salmon", "Chicken Parmesan", "Beef Stir-Fry", "Roasted Lamb Chops",
-                "Pork Tenderloin", "Vegetable Curry", "Steak Ribeye", "BBQ Ribs",
-                "Tofu Stir-Fry", "Shrimp Scampi"],
-    "Sides": ["French Fries", "Sweet Potato Fries", "Mashed Potatoes", "Coleslaw", "Steamed Broccoli",
-              "Garlic Mashed Cauliflower", "Mac and Cheese", "Sauteed Spinach", "Roasted Veggies"],
-    "Desserts": ["Chocolate Lava Cake", "New York Cheesecake", "Tiramisu", "Apple Pie",
-                 "Creme Brulee", "Ice Cream Sundae", "Brownie", "Key Lime Pie"],
-    "Beverages": ["Soda", "Iced Tea", "Lemonade", "Coffee", "Espresso", "Bottled Water",
-                  "Orange Juice", "Milkshake", "Smoothie"]
-}
 
 # --- Main Application Class ---
 class CafeApp:
-    def __init__(self, root):
+    def __init__(self, root, profile=None, on_ready=None, pos_client=None, order_id=None):
         self.root = root
+        self.profile = profile or StartupProfile()
+        self.on_ready = on_ready
+        self.pos_client = pos_client
         self.root.title("Café Menu & Billing")
         self.root.geometry("1000x700")  # Increased window size for better layout
-        self.order = {}
+        if pos_client:
+            # Thin client: the POS server owns the menu, the order and invoice numbers
+            from pos_client import RemoteOrder, menu_from_server
+            reply = pos_client.call("menu")
+            self.menu_version = reply["version"]
+            menu, categories, prices = menu_from_server(reply)
+            self.catalog_watcher = None
+            self.billing = BillingEngine(menu, categories, prices=prices)
+            self.order = RemoteOrder(pos_client, order_id, prices)
+            self.root.title(f"Café Menu & Billing - order {self.order.order_id}")
+        else:
+            # Prices hot-reload from menu.json; see on_catalog_change
+            self.catalog_watcher = CatalogWatcher(root, self.on_catalog_change)
+            snapshot = self.catalog_watcher.snapshot
+            self.billing = BillingEngine(snapshot.menu, snapshot.categories, prices=snapshot.catalog.cents)
+            self.order = self.billing.new_order()
+        self.order.listeners.append(self.on_order_change)
+        self.profile.mark("load catalog")
+        # Opened in finish_startup, after the window is on screen
+        self.journal = None
+        self.store = None
+        self.io_worker = None
+        self.menu_poll_id = None
+        self.unsaved = {}       # invoice key -> record, until the save succeeds
+        self.save_retries = {}  # invoice key -> after() id of a pending retry
         self.dark_mode = tk.BooleanVar()
         self.search_var = tk.StringVar()
+        self.search_index = MenuSearchIndex(self.billing.menu)
+        self.plu_index = PLUIndex(self.billing.categories)
+        self.code_var = tk.StringVar()
+        self.profile.mark("build indexes")
 
         # Café Logo/Title
         self.logo_label = ttk.Label(root, text="Café Delight", font=("Georgia", 24, "bold"), foreground="#8B4513")  # SaddleBrown
@@ -76,6 +126,14 @@ class CafeApp:
         ttk.Button(top_frame, text="Search", command=self.search_item).pack(side=tk.LEFT, padx=5)
         ttk.Checkbutton(top_frame, text="Dark Mode", variable=self.dark_mode, command=self.toggle_dark_mode).pack(side=tk.RIGHT)
 
+        # Rapid entry: type item codes such as "3*PZ2 BV4" and press Enter
+        ttk.Label(top_frame, text="Code:").pack(side=tk.LEFT, padx=(15, 0))
+        self.code_entry = ttk.Entry(top_frame, textvariable=self.code_var, width=20)
+        self.code_entry.pack(side=tk.LEFT, padx=5)
+        self.code_entry.bind("<Return>", lambda event: self.enter_codes())
+        self.root.bind("<F2>", lambda event: self.code_entry.focus_set())
+        self.code_entry.focus_set()
+
         # Main content frame with two columns
         self.content_frame = ttk.Frame(root)
         self.content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -86,31 +144,43 @@ class CafeApp:
 
         self.canvas = tk.Canvas(self.menu_frame)
         self.scrollbar = ttk.Scrollbar(self.menu_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
 
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        # Only the rows in view get widgets; they are reused while scrolling
+        self.menu_list = VirtualMenuList(self.canvas, self.scrollbar,
+                                         item_text=lambda item: f"[{self.plu_index.code_of[item]}] {item}: ${self.billing.menu[item]:.2f}",
+                                         on_click=self.add_item_from_menu_click)
 
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.scrollbar.pack(side=tk.RIGHT, fill="y")
 
-        self.display_menu()
-
         # Order Display Frame (Right Column)
         self.order_display_frame = ttk.Frame(self.content_frame, relief=tk.GROOVE, borderwidth=2)
         self.order_display_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
 
         # Create the current order label and text box
         ttk.Label(self.order_display_frame, text="Current Order", style="Category.TLabel").pack(pady=5)
-        self.current_order_text = scrolledtext.ScrolledText(self.order_display_frame, height=15, width=40, state='disabled', font=("Courier", 10))
-        self.current_order_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        order_text_frame = ttk.Frame(self.order_display_frame)
+        order_text_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.current_order_text = tk.Text(order_text_frame, height=15, width=40, state='disabled', font=("Courier", 10))
+        order_scrollbar = ttk.Scrollbar(order_text_frame, orient="vertical", command=self.current_order_text.yview)
+        self.current_order_text.config(yscrollcommand=order_scrollbar.set)
+        order_scrollbar.pack(side=tk.RIGHT, fill="y")
+        self.current_order_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.order_panel = OrderPanel(
+            self.current_order_text,
+            header_lines=["--- Your Current Order ---"],
+            format_line=lambda item, qty, line_total: f"{item} (x{qty}): ${format_cents(line_total)}",
+            format_subtotal=lambda subtotal: f"Subtotal: ${format_cents(subtotal)}",
+            separator="-" * 26)
 
         # Order Control Buttons
         order_buttons_frame = ttk.Frame(self.order_display_frame)
         order_buttons_frame.pack(fill=tk.X, pady=5)
         ttk.Button(order_buttons_frame, text="Clear Order", command=self.clear_order).pack(side=tk.LEFT, expand=True, padx=5)
+        ttk.Button(order_buttons_frame, text="Undo", command=self.undo_order_change).pack(side=tk.LEFT, expand=True, padx=5)
+        self.root.bind("<Control-z>", lambda event: self.undo_order_change())
         ttk.Button(order_buttons_frame, text="Generate Invoice", command=self.generate_invoice).pack(side=tk.LEFT, expand=True, padx=5)
+        ttk.Button(order_buttons_frame, text="History", command=self.show_history).pack(side=tk.LEFT, expand=True, padx=5)
 
         # Quantity input for direct add if needed for more than 1 (though clicks are usually for 1)
         self.qty_frame = ttk.Frame(order_buttons_frame)
@@ -119,10 +189,78 @@ class CafeApp:
         self.qty_var = tk.StringVar(value="1")
         ttk.Entry(self.qty_frame, textvariable=self.qty_var, width=5).pack(side=tk.LEFT)
 
+        # Non-modal notifications so item adds never block the till
+        self.toaster = Toaster(root)
+        # Ctrl+Shift+D opens the callback timing panel
+        self.debug_panel = DebugPanel(root)
+
         # Set theme after all widgets are created
         self.set_theme()
 
         self.update_order_display()  # Initial update
+        self.profile.mark("build widgets")
+
+        # The first after_idle runs once Tk's own idle redraws are queued; the
+        # nested after(0) then lands behind them, i.e. after the first paint
+        self.root.after_idle(lambda: self.root.after(0, self.finish_startup))
+
+    def finish_startup(self):
+        """Work deferred until the window has been drawn once."""
+        self.profile.mark("first paint")
+        self.display_menu()
+        self.root.update_idletasks()
+        self.profile.mark("build menu")
+        if not self.pos_client:
+            self.journal = InvoiceJournal()
+            self.store = OrderStore()
+        # Invoice saves run off the Tk thread, which also syncs the journal once idle
+        if self.pos_client:
+            from pos_client import PosError  # Refused by the server: retrying cannot help
+            self.io_worker = IOWorker(self.root, no_retry=(PosError,))
+            self.order.run = self.run_remote
+            self.menu_poll_id = self.root.after(MENU_POLL_MS, self.poll_menu)
+        else:
+            self.io_worker = IOWorker(self.root, on_idle=self.journal.sync_if_due)
+            self.resubmit_unsaved()
+        self.profile.mark("open journal and store")
+        if self.on_ready:
+            self.on_ready()
+        self.profile.report()
+
+    def run_remote(self, job, on_done):
+        """Send a thin-client order change from the I/O worker; changes are not retried."""
+        try:
+            self.io_worker.submit(job, on_success=on_done, on_error=self.remote_change_failed, attempts=1)
+        except queue.Full:
+            self.toaster.show("Server is busy, please try again.", "warning")
+
+    def remote_change_failed(self, error):
+        self.toaster.show(f"Order not updated: {error}", "error")
+
+    def poll_menu(self):
+        """Ask the server, off the Tk thread, whether the menu changed since ours."""
+        version = self.menu_version
+        try:
+            self.io_worker.submit(lambda: self.pos_client.call("menu", version=version),
+                                  on_success=self.on_server_menu, on_error=self.menu_poll_failed, attempts=1)
+        except queue.Full:
+            self.menu_poll_failed(None)
+
+    def menu_poll_failed(self, error):
+        # Quietly try again later; order changes already report a down server
+        self.menu_poll_id = self.root.after(MENU_POLL_MS, self.poll_menu)
+
+    def on_server_menu(self, reply):
+        self.menu_poll_id = self.root.after(MENU_POLL_MS, self.poll_menu)
+        if reply.get("unchanged"):
+            return
+        from pos_client import menu_from_server
+        self.menu_version = reply["version"]
+        menu, categories, prices = menu_from_server(reply)
+        old = self.billing
+        changed = {item for item, cents in prices.items() if old.prices.get(item, cents) != cents}
+        self.apply_menu(BillingEngine(menu, categories, prices=prices), changed,
+                        categories != old.categories)
 
     def set_theme(self):
         style = ttk.Style()
@@ -179,84 +317,91 @@ class CafeApp:
         else:
             self.set_theme()  # Revert to light mode settings
 
+    @traced
     def display_menu(self):
-        # Clear existing menu items before displaying
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for category, items in categories.items():
-            ttk.Label(self.scrollable_frame, text=category, style="Category.TLabel").pack(anchor="w", pady=5)
-            for item in items:
-                # Create a button for each menu item, making it clickable
-                item_button = ttk.Button(self.scrollable_frame,
-                                         text=f"{item}: ${menu[item]:.2f}",
-                                         command=lambda i=item: self.add_item_from_menu_click(i),
-                                         style="MenuItem.TButton")
-                item_button.pack(anchor="w", padx=10, fill=tk.X)
+        self.menu_list.set_rows(build_rows(self.billing.categories))
 
+    @traced
     def search_item(self):
         keyword = self.search_var.get().lower()
-        # Clear current menu display
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
         if keyword:
-            found_items = {cat: [] for cat in categories}
-            for cat, items in categories.items():
-                for item in items:
-                    if keyword in item.lower():
-                        found_items[cat].append(item)
-            
-            displayed_any = False
-            for category, items_in_cat in found_items.items():
-                if items_in_cat:
-                    ttk.Label(self.scrollable_frame, text=category, style="Category.TLabel").pack(anchor="w", pady=5)
-                    for item in items_in_cat:
-                        item_button = ttk.Button(self.scrollable_frame,
-                                                 text=f"{item}: ${menu[item]:.2f}",
-                                                 command=lambda i=item: self.add_item_from_menu_click(i),
-                                                 style="MenuItem.TButton")
-                        item_button.pack(anchor="w", padx=10, fill=tk.X)
-                    displayed_any = True
-            if not displayed_any:
-                ttk.Label(self.scrollable_frame, text="No items found matching your search.", foreground="red").pack(pady=10)
+            self.menu_list.apply_filter(self.search_index.search_names(keyword))
         else:
-            self.display_menu()  # Re-display full menu if search is cleared
+            self.menu_list.apply_filter(None)  # Re-display full menu if search is cleared
 
+    @traced
     def add_item_from_menu_click(self, item_name):
         try:
             quantity_to_add = int(self.qty_var.get())
             if quantity_to_add <= 0:
                 raise ValueError
         except ValueError:
-            messagebox.showerror("Error", "Invalid quantity. Please enter a positive number.")
+            self.toaster.show("Invalid quantity. Please enter a positive number.", "error")
             return
 
-        self.order[item_name] = self.order.get(item_name, 0) + quantity_to_add
-        self.update_order_display()
-        messagebox.showinfo("Item Added", f"Added {quantity_to_add} x {item_name} to order.")
+        self.order.add(item_name, quantity_to_add)
+        self.toaster.item_added(item_name, quantity_to_add)
 
-    def update_order_display(self):
-        self.current_order_text.config(state='normal')
-        self.current_order_text.delete(1.0, tk.END)
-        if not self.order:
-            self.current_order_text.insert(tk.END, "Your order is empty.")
+    @traced
+    def enter_codes(self):
+        try:
+            lines = self.plu_index.parse(self.code_var.get())
+        except ValueError as e:
+            self.toaster.show(str(e), "error")
+            return
+        for item_name, qty in lines:
+            self.order.add(item_name, qty)
+            self.toaster.item_added(item_name, qty)
+        self.code_var.set("")
+
+    def on_catalog_change(self, old, new):
+        changed, structure_changed = old.diff(new)
+        self.apply_menu(BillingEngine(new.menu, new.categories, prices=new.catalog.cents),
+                        changed, structure_changed)
+
+    def apply_menu(self, billing, changed, structure_changed):
+        """Switch to a new menu from the local catalog or the server."""
+        self.billing = billing
+        # An open order keeps the prices it was started with
+        if self.order:
+            self.order.add_prices(self.billing.prices)
+        else:
+            self.order.reprice(self.billing.prices)
+
+        if structure_changed:
+            self.search_index = MenuSearchIndex(billing.menu)
+            self.plu_index = PLUIndex(billing.categories)
+            self.display_menu()
+            self.search_item()
+        elif changed:
+            self.menu_list.refresh_items(changed)
+        self.toaster.show(f"Menu updated ({len(changed)} price change(s)).")
+
+    def on_order_change(self, item):
+        if not self.order and self.order.prices is not self.billing.prices:
+            self.order.reprice(self.billing.prices)  # Next order uses current prices
+        if item is None:
+            self.update_order_display()
         else:
-            order_summary = "--- Your Current Order ---\n"
-            for item, qty in self.order.items():
-                order_summary += f"{item} (x{qty}): ${menu[item] * qty:.2f}\n"
-            self.current_order_text.insert(tk.END, order_summary)
-        self.current_order_text.config(state='disabled')
+            self.order_panel.set_line(item, self.order.quantities.get(item, 0), self.order.line_total(item))
+
+    @traced
+    def update_order_display(self):
+        self.order_panel.reset((item, qty, self.order.line_total(item)) for item, qty in self.order.items())
+
+    def undo_order_change(self):
+        self.order.undo()
 
     def clear_order(self):
-        if messagebox.askyesno("Confirm", "Clear entire order?"):
+        if self.order:
+            # No confirmation dialog: clearing is undoable
             self.order.clear()
-            self.update_order_display()
-            messagebox.showinfo("Cleared", "Order cleared.")
+            self.toaster.show("Order cleared. Press Ctrl+Z to undo.")
 
+    @traced
     def generate_invoice(self):
         if not self.order:
-            messagebox.showwarning("Warning", "Order is empty.")
+            self.toaster.show("Order is empty.", "warning")
             return
 
         invoice_win = tk.Toplevel(self.root)
@@ -265,51 +410,198 @@ class CafeApp:
         if self.dark_mode.get():
             invoice_win.config(bg="#2e2e2e")
 
+        from tkinter import scrolledtext  # Only needed once an invoice is shown
         text = scrolledtext.ScrolledText(invoice_win, font=("Courier", 10))
         text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         if self.dark_mode.get():
             text.config(bg="#444", fg="white", insertbackground="white")
 
-        invoice_text = self.generate_invoice_text()
-        text.insert(tk.END, invoice_text)
+        # Snapshot the order so the saved invoice matches what is shown
+        record = invoice_record(self.order, datetime.now())
+        text.insert(tk.END, render_record(record))
         text.config(state="disabled")
 
-        ttk.Button(invoice_win, text="Save Invoice", command=lambda: self.save_invoice(invoice_text)).pack(pady=5)
+        ttk.Button(invoice_win, text="Save Invoice", command=lambda: self.save_invoice(record)).pack(pady=5)
 
     def generate_invoice_text(self):
-        subtotal = sum(menu[item] * qty for item, qty in self.order.items())
-        tax = subtotal * 0.08
-        total = subtotal + tax
-        lines = [
-            f"=== Café Invoice ===",
-            f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "----------------------------------------------",
-            f"{'Item':<25}{'Qty':<5}{'Price':<8}{'Total'}",
-            "-" * 50
-        ]
-        for item, qty in self.order.items():
-            lines.append(f"{item:<25}{qty:<5}${menu[item]:<8.2f}${menu[item] * qty:.2f}")
-        lines += [
-            "-" * 50,
-            f"{'Subtotal':<40}${subtotal:.2f}",
-            f"{'Tax (8%)':<40}${tax:.2f}",
-            f"{'Total':<40}${total:.2f}",
-            "----------------------------------------------",
-            "Thank you for dining with us!"
-        ]
-        return "\n".join(lines)
-
-    def save_invoice(self, text):
-        filename = f"invoice_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        return self.billing.render_invoice(self.order)
+
+    @traced
+    def save_invoice(self, record):
+        if self.io_worker is None:
+            self.toaster.show("Still starting up, please try again.", "warning")
+            return
+        self.unsaved[record["key"]] = record
+        retry = self.save_retries.pop(record["key"], None)
+        if retry:
+            self.root.after_cancel(retry)  # Saved again by hand before the retry fired
         try:
-            with open(filename, "w") as f:
-                f.write(text)
-            messagebox.showinfo("Saved", f"Invoice saved as '{filename}'")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            self.io_worker.submit(lambda: self.write_invoice(record),
+                                  on_success=lambda seq: self.invoice_saved(record, seq),
+                                  on_error=lambda e: self.invoice_save_failed(record, e))
+        except queue.Full:
+            # Never drop an invoice: hold it and submit it again shortly
+            self.toaster.show("Still saving earlier invoices; this one will follow.", "warning")
+            self.retry_save(record, 1000)
+
+    def retry_save(self, record, delay_ms):
+        key = record["key"]
+        if key not in self.save_retries:
+            self.save_retries[key] = self.root.after(delay_ms, self.save_invoice, record)
+
+    @traced
+    def write_invoice(self, record):
+        # Runs on the I/O worker thread
+        if self.pos_client:
+            # The server numbers and stores the invoice from its copy of the order, and
+            # refuses it if that no longer matches what was shown; the key makes retries safe
+            return self.pos_client.call("invoice", order=self.order.order_id,
+                                        expect=record["lines"], key=record["key"])["seq"]
+        # Retrying is safe: the journal returns the first seq for a key it already holds
+        seq = self.journal.append(record)
+        self.store.save_invoice(record, seq)
+        return seq
+
+    def invoice_saved(self, record, seq):
+        self.unsaved.pop(record["key"], None)
+        self.toaster.show(f"Invoice #{seq} saved.")
+        if self.pos_client:
+            self.order.sync()  # The server has started the order afresh
+
+    def invoice_save_failed(self, record, error):
+        if self.pos_client and not isinstance(error, OSError):
+            self.unsaved.pop(record["key"], None)
+            self.toaster.show(f"Invoice refused by the server: {error}", "error")
+            return
+        # Keep the invoice and try again later rather than dropping it
+        self.toaster.show(f"Invoice not saved ({error}). Retrying in 30 s.", "error")
+        self.retry_save(record, 30000)
+
+    def flush_unsaved(self):
+        """Write invoices still waiting for a retry now, on this thread; used on close."""
+        for after_id in self.save_retries.values():
+            self.root.after_cancel(after_id)
+        self.save_retries.clear()
+        for key, record in list(self.unsaved.items()):
+            try:
+                self.write_invoice(record)
+                del self.unsaved[key]
+            except Exception:
+                # Keep it on disk for the next start rather than printing it to a
+                # stderr the windowed build does not have
+                with open(UNSAVED_PATH, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def resubmit_unsaved(self):
+        """Queue invoices left in UNSAVED_PATH by an earlier session.
+
+        Only a standalone till replays them: a thin client's invoice is of
+        the server's order, so its leftovers stay in the file for a manager.
+        """
+        try:
+            with open(UNSAVED_PATH, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+        # Anything still unsaved at close is written back by flush_unsaved
+        os.remove(UNSAVED_PATH)
+        for record in records:
+            self.save_invoice(record)
+        self.toaster.show(f"Saving {len(records)} invoice(s) left over from the last session.")
+
+    def show_history(self):
+        if self.io_worker is None:
+            self.toaster.show("Still starting up, please try again.", "warning")
+            return
+        if self.pos_client:
+            job = lambda: self.pos_client.call("recent_invoices")
+        else:
+            job = self.store.recent_invoices
+        self.run_lookup(job, self.open_history)
+
+    def run_lookup(self, job, on_done):
+        """Run a read-only history lookup on the I/O worker; errors become a toast."""
+        try:
+            self.io_worker.submit(job, on_success=on_done, on_error=self.lookup_failed, attempts=1)
+        except queue.Full:
+            self.toaster.show("Still saving invoices, please try again.", "warning")
+
+    def lookup_failed(self, error):
+        self.toaster.show(f"Could not load invoice history: {error}", "error")
+
+    def open_history(self, invoices):
+        history_win = tk.Toplevel(self.root)
+        history_win.title("Invoice History")
+        history_win.geometry("400x400")
+
+        listbox = tk.Listbox(history_win, font=("Courier", 10))
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        for _, seq, created_at, total_cents in invoices:
+            listbox.insert(tk.END, f"#{seq:<6}{created_at}  ${format_cents(total_cents)}")
+
+        def reprint(event):
+            selection = listbox.curselection()
+            if not selection:
+                return
+            seq = invoices[selection[0]][1]
+            if self.pos_client:
+                job = lambda: self.pos_client.call("invoice_text", seq=seq)
+            else:
+                job = lambda: self.journal.render_text(seq)
+            self.run_lookup(job, lambda text: self.open_reprint(history_win, seq, text))
+
+        listbox.bind("<Double-Button-1>", reprint)
+
+    def open_reprint(self, history_win, seq, invoice_text):
+        if not history_win.winfo_exists():
+            return  # History closed while the invoice was loading
+        reprint_win = tk.Toplevel(history_win)
+        reprint_win.title(f"Invoice #{seq}")
+        from tkinter import scrolledtext
+        text = scrolledtext.ScrolledText(reprint_win, font=("Courier", 10))
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text.insert(tk.END, invoice_text)
+        text.config(state="disabled")
+
+    def on_close(self):
+        if self.catalog_watcher:
+            self.catalog_watcher.stop()
+        if self.io_worker:
+            self.io_worker.stop()
+            self.flush_unsaved()
+        if self.menu_poll_id:
+            # After stop(): a poll answered while stopping has scheduled the next one
+            self.root.after_cancel(self.menu_poll_id)
+        if self.store:
+            self.store.close()
+            self.journal.close()
+        if self.pos_client:
+            self.pos_client.close()
+        self.root.destroy()
 
 # --- Run App ---
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Café menu and billing till.")
+    parser.add_argument("--profile-startup", action="store_true", help="print startup timings")
+    parser.add_argument("--trace", action="store_true", help="record callback timings from the start")
+    parser.add_argument("--server", metavar="HOST:PORT", help="run as a thin client of a POS server")
+    parser.add_argument("--order", help="order to open on the server, e.g. a table such as T4")
+    args = parser.parse_args()
+
+    profile = StartupProfile(args.profile_startup)
+    install_tk_hook()  # Before any widget registers a callback
+    if args.trace:
+        TRACER.enabled = True
+    pos_client = None
+    if args.server:
+        from pos_client import PosClient, parse_address
+        pos_client = PosClient(*parse_address(args.server))
     root = tk.Tk()
-    app = CafeApp(root)
+    root.withdraw()  # Stay hidden behind the splash until the layout is built
+    splash = show_splash(root)
+    profile.mark("create Tk and splash")
+    app = CafeApp(root, profile, on_ready=splash.destroy, pos_client=pos_client, order_id=args.order)
+    root.deiconify()
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
\ No newline at end of file
@@ -1,4 +1,11 @@
 # -*- mode: python ; coding: utf-8 -*-
+# One-folder build: a one-file EXE unpacks itself to a temp dir on every
+# launch, which dominated cold start on the till PCs. UPX is off because
+# decompressing the Tcl/Tk DLLs at load time costs more than it saves on disk.
+# menu.json is read from next to NewApp.exe (not from _internal/), so it is
+# copied there after COLLECT; edit that copy to change prices on a till.
+import os
+import shutil
 
 
 a = Analysis(
@@ -10,25 +17,23 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['numpy'],
     noarchive=False,
-    optimize=0,
+    optimize=1,
 )
 pyz = PYZ(a.pure)
 
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='NewApp',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=False,
     upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,3 +41,14 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='NewApp',
+)
+
+shutil.copy2(os.path.join(SPECPATH, 'menu.json'), os.path.join(DISTPATH, 'NewApp', 'menu.json'))
@@ -0,0 +1,244 @@
+"""UI latency benchmarks for CafeApp.
+
+Drives the real CafeApp under Tk with synthetic menus and orders and reports
+p50/p99 latency per operation. Results are written as JSON together with the
+git commit so runs can be compared:
+
+    python benchmarks/bench_cafe.py --output before.json
+    python benchmarks/bench_cafe.py --output after.json --compare before.json
+
+On Linux without a display an Xvfb server is started for the run (Xvfb must
+be installed); on Windows and macOS the normal desktop is used and the
+window shows briefly.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Make the app modules importable when run from the benchmarks folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+from NewApp import CafeApp
+
+MENU_SIZES = [100, 1000, 10000, 100000]
+ORDER_LINES = [1, 10, 100, 1000]
+ITEMS_PER_CATEGORY = 50
+WORDS = ["Spicy", "Garden", "Classic", "Smoked", "Royal", "Golden", "Fresh", "Rustic", "House", "Double",
+         "Chicken", "Paneer", "Veggie", "Mushroom", "Cheese", "Mango", "Chocolate", "Lemon", "Berry", "Caramel",
+         "Pizza", "Burger", "Wrap", "Salad", "Soup", "Shake", "Latte", "Tart", "Sandwich", "Pasta"]
+
+
+# --- Synthetic data ---
+def write_catalog(directory, n_items, seed=0):
+    """Write a menu.json with `n_items` uniquely named items; returns the path."""
+    rng = random.Random(seed)
+    categories = {}
+    for i in range(n_items):
+        category = categories.setdefault(f"Category {i // ITEMS_PER_CATEGORY:04d}", {})
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} #{i}"
+        category[name] = rng.randrange(100, 3000) / 100
+    path = os.path.join(directory, f"menu-{n_items}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"categories": categories}, f)
+    return path
+
+
+def search_queries(names, count, seed=0):
+    """Substrings of real item names, 1-6 characters, like a cashier typing."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names).lower()
+        length = rng.randint(1, 6)
+        start = rng.randrange(max(1, len(name) - length))
+        queries.append(name[start:start + length])
+    return queries
+
+
+# --- Display ---
+@contextmanager
+def virtual_display():
+    """Run under an Xvfb display when there is no X display available."""
+    if sys.platform in ("win32", "darwin") or os.environ.get("DISPLAY"):
+        yield
+        return
+    if not shutil.which("Xvfb"):
+        sys.exit("No DISPLAY and Xvfb is not installed; install xvfb or run under a desktop session.")
+    display = f":{random.randint(100, 999)}"
+    server = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        # Wait until the server accepts connections
+        for _ in range(100):
+            try:
+                tk.Tk().destroy()
+                break
+            except tk.TclError:
+                time.sleep(0.05)
+        yield
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+
+# --- Measurement ---
+def percentile(samples, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(op, samples, **params):
+    ms = [s * 1000 for s in samples]
+    return dict(op=op, **params, n=len(ms), p50_ms=round(percentile(ms, 50), 3),
+                p99_ms=round(percentile(ms, 99), 3), mean_ms=round(sum(ms) / len(ms), 3))
+
+
+def timed(root, fn, repeat):
+    """Time `fn()` plus the Tk layout work it queues, `repeat` times."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        root.update_idletasks()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def start_app():
+    """Build a CafeApp and pump events until its deferred startup is done."""
+    root = tk.Tk()
+    ready = []
+    app = CafeApp(root, on_ready=lambda: ready.append(True))
+    while not ready:
+        root.update()
+    return root, app
+
+
+# --- Benchmarks ---
+def bench_menu(n_items, order_lines, repeat, startup_repeat, workdir):
+    os.environ["CAFE_MENU"] = write_catalog(workdir, n_items)
+    results = []
+
+    # The first start builds the catalog cache; later ones load it
+    samples = []
+    for i in range(startup_repeat):
+        start = time.perf_counter()
+        root, app = start_app()
+        samples.append(time.perf_counter() - start)
+        if i < startup_repeat - 1:
+            app.on_close()
+    results.append(summarize("startup_cold", samples[:1], menu_items=n_items))
+    if len(samples) > 1:
+        results.append(summarize("startup", samples[1:], menu_items=n_items))
+
+    names = list(app.billing.menu)
+    results.append(summarize("display_menu", timed(root, app.display_menu, repeat), menu_items=n_items))
+
+    queries = iter(search_queries(names, repeat))
+    def search():
+        app.search_var.set(next(queries))
+        app.search_item()
+    results.append(summarize("search_item", timed(root, search, repeat), menu_items=n_items))
+    app.search_var.set("")
+    app.search_item()
+
+    for lines in order_lines:
+        if lines > len(names):
+            continue
+        app.order.clear()
+        for item in names[:lines]:
+            app.order.set_quantity(item, 2)
+        root.update_idletasks()
+        params = dict(menu_items=n_items, order_lines=lines)
+        results.append(summarize("update_order_display", timed(root, app.update_order_display, repeat), **params))
+        results.append(summarize("generate_invoice_text", timed(root, app.generate_invoice_text, repeat), **params))
+        items = iter(names[i % lines] for i in range(repeat))
+        results.append(summarize("add_item", timed(root, lambda: app.order.add(next(items)), repeat), **params))
+
+    app.on_close()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def result_key(result):
+    return result["op"], result.get("menu_items"), result.get("order_lines")
+
+
+def print_results(results, baseline=None):
+    previous = {result_key(r): r for r in baseline["results"]} if baseline else {}
+    print(f"{'operation':<24}{'items':>8}{'lines':>7}{'p50 ms':>11}{'p99 ms':>11}" + ("   p50 vs base" if previous else ""))
+    for r in results:
+        row = f"{r['op']:<24}{r['menu_items']:>8}{r.get('order_lines', ''):>7}{r['p50_ms']:>11.3f}{r['p99_ms']:>11.3f}"
+        base = previous.get(result_key(r))
+        if base and base["p50_ms"]:
+            row += f"   {r['p50_ms'] / base['p50_ms']:>6.2f}x"
+        print(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CafeApp UI operations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=MENU_SIZES, help="menu sizes (items)")
+    parser.add_argument("--lines", type=int, nargs="+", default=ORDER_LINES, help="order sizes (lines)")
+    parser.add_argument("--repeat", type=int, default=50, help="samples per operation")
+    parser.add_argument("--startup-repeat", type=int, default=5, help="app starts per menu size")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="cafe-bench-") as workdir, virtual_display():
+        # The journal and SQLite store are created in the working directory
+        os.chdir(workdir)
+        try:
+            for n_items in args.sizes:
+                print(f"Menu of {n_items} items...", file=sys.stderr)
+                results.extend(bench_menu(n_items, args.lines, args.repeat, args.startup_repeat, workdir))
+        finally:
+            os.chdir(cwd)
+            os.environ.pop("CAFE_MENU", None)
+
+    run = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "tk": tk.TkVersion,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(run, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from catalog import load_catalog
+from order import TAX_RATE_BP, Order, compute_tax, format_cents, to_cents
+
+# --- Menu Items & Categories ---
+# Loaded from the external catalog (menu.json) so price changes need no rebuild.
+# `menu` and `categories` are read on first access rather than at import time:
+# the app gets its catalog from CatalogWatcher and should not parse it twice.
+def _default_catalog():
+    global menu, categories
+    if "menu" not in globals():
+        menu, categories = load_catalog()
+    return menu, categories
+
+
+def __getattr__(name):
+    if name == "menu":
+        return _default_catalog()[0]
+    if name == "categories":
+        return _default_catalog()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# --- Invoice Rendering ---
+class InvoiceRenderer:
+    """Invoice text renderer with templates and price strings built once.
+
+    A single renderer is reused for every invoice in a batch, so per-invoice
+    work is limited to the order lines themselves.
+    """
+
+    HEADER = "\n".join([
+        "=== Café Invoice ===",
+        "Date: {date}",
+        "----------------------------------------------",
+        f"{'Item':<25}{'Qty':<5}{'Price':<8}{'Total'}",
+        "-" * 50,
+    ])
+
+    def __init__(self, prices, tax_rate_bp=TAX_RATE_BP):
+        self.prices = prices
+        self.tax_rate_bp = tax_rate_bp
+        self.price_text = {}  # item -> "$6.50    " column, filled on first use
+        self.tax_label = f"{f'Tax ({tax_rate_bp / 100:g}%)':<40}$"
+
+    def render(self, lines, when):
+        """Render (item, qty) pairs as an invoice dated `when`."""
+        prices = self.prices
+        price_text = self.price_text
+        out = [self.HEADER.format(date=when.strftime('%Y-%m-%d %H:%M:%S'))]
+        subtotal = 0
+        for item, qty in lines:
+            unit = prices[item]
+            column = price_text.get(item)
+            if column is None:
+                column = price_text[item] = f"${format_cents(unit):<8}"
+            line_total = unit * qty
+            subtotal += line_total
+            out.append(f"{item:<25}{qty:<5}{column}${format_cents(line_total)}")
+        tax = compute_tax(subtotal, self.tax_rate_bp)
+        out += [
+            "-" * 50,
+            f"{'Subtotal':<40}${format_cents(subtotal)}",
+            f"{self.tax_label}{format_cents(tax)}",
+            f"{'Total':<40}${format_cents(subtotal + tax)}",
+            "----------------------------------------------",
+            "Thank you for dining with us!"
+        ]
+        return "\n".join(out)
+
+
+# Renderer owned by each pool worker, set up once by _init_worker
+_worker_renderer = None
+
+
+def _init_worker(prices, tax_rate_bp):
+    global _worker_renderer
+    _worker_renderer = InvoiceRenderer(prices, tax_rate_bp)
+
+
+def _render_chunk(chunk):
+    return [_worker_renderer.render(lines, when) for when, lines in chunk]
+
+
+# --- Billing Engine ---
+class BillingEngine:
+    """Menu lookup, order math and invoice rendering with no GUI dependency.
+
+    CafeApp is a thin client of this class; it can equally be used from a
+    worker process, a server or a benchmark without a display.
+    """
+
+    def __init__(self, menu=None, categories=None, tax_rate_bp=TAX_RATE_BP, prices=None):
+        if menu is None:
+            menu, categories = _default_catalog()
+        self.menu = menu
+        self.categories = categories
+        self.tax_rate_bp = tax_rate_bp
+        # A compact Catalog passes its cents view to avoid building a dict
+        self.prices = prices if prices is not None else {item: to_cents(price) for item, price in menu.items()}
+
+    def price(self, item):
+        """Unit price of `item` in cents."""
+        return self.prices[item]
+
+    def new_order(self, lines=()):
+        """Create an Order, optionally pre-filled from (item, qty) pairs."""
+        order = Order(self.prices, self.tax_rate_bp)
+        for item, qty in lines:
+            order.add(item, qty)
+        return order
+
+    def render_invoice(self, order, when=None):
+        """Render the plain-text invoice for `order` dated `when` (default: now)."""
+        renderer = InvoiceRenderer(order.prices, order.tax_rate_bp)
+        return renderer.render(order.items(), when or datetime.now())
+
+    def render_invoices(self, orders, processes=None, chunksize=256):
+        """Stream rendered invoices for many orders, in input order.
+
+        `orders` is an iterable of (when, lines) pairs where `lines` is an
+        Order or any iterable of (item, qty). Prices and templates are
+        prepared once for the whole batch. With `processes` set, chunks of
+        `chunksize` orders are rendered on a process pool; the input is still
+        consumed lazily, with at most two chunks per worker in flight.
+        """
+        if not processes:
+            renderer = InvoiceRenderer(self.prices, self.tax_rate_bp)
+            for when, lines in orders:
+                yield renderer.render(_as_lines(lines), when)
+            return
+
+        # Imported here: multiprocessing is slow to import and the till never needs it
+        from concurrent.futures import ProcessPoolExecutor
+
+        orders = iter(orders)
+        chunks = iter(lambda: [(when, list(_as_lines(lines))) for when, lines in islice(orders, chunksize)], [])
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(self.prices, self.tax_rate_bp)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_render_chunk, chunk))
+                if len(in_flight) >= processes * 2:
+                    yield from in_flight.popleft().result()
+            while in_flight:
+                yield from in_flight.popleft().result()
+
+
+def _as_lines(lines):
+    return lines.items() if isinstance(lines, Order) else lines
@@ -0,0 +1,337 @@
+import csv
+import hashlib
+import io
+import json
+import marshal
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+
+from order import format_cents, to_cents
+
+CACHE_VERSION = 2  # Bump whenever the record layout changes
+CACHE_KEYS = ("mtime_ns", "size", "sha1", "names", "cents", "category_names", "starts", "by_name")
+CACHE_SUFFIX = ".cache"
+
+
+def default_catalog_path():
+    """menu.json next to the executable (frozen build) or this module.
+
+    The CAFE_MENU environment variable overrides the location.
+    """
+    if os.environ.get("CAFE_MENU"):
+        return os.environ["CAFE_MENU"]
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, "menu.json")
+
+
+def parse_catalog(data, path):
+    """Parse catalog bytes into (menu, categories).
+
+    JSON catalogs look like {"categories": {"Pizzas": {"Margherita Pizza": 12.5}}}.
+    CSV catalogs have category, item and price columns with a header row.
+    Raises ValueError for anything else, so callers have one error to handle.
+    """
+    menu = {}
+    categories = {}
+    if path.lower().endswith(".csv"):
+        for line, row in enumerate(csv.DictReader(io.StringIO(data.decode("utf-8-sig"))), start=2):
+            category, item = row.get("category"), row.get("item")
+            if not isinstance(category, str) or not isinstance(item, str):
+                raise ValueError(f"{path}:{line}: expected category, item and price columns")
+            item = item.strip()
+            menu[item] = _price(row.get("price"), f"{path}:{line}")
+            categories.setdefault(category.strip(), []).append(item)
+    else:
+        catalog = json.loads(data)
+        if not isinstance(catalog, dict) or not isinstance(catalog.get("categories"), dict):
+            raise ValueError(f"{path}: expected {{\"categories\": {{category: {{item: price}}}}}}")
+        for category, items in catalog["categories"].items():
+            if not isinstance(items, dict):
+                raise ValueError(f"{path}: category {category!r} must map items to prices")
+            categories[category] = list(items)
+            for item, price in items.items():
+                menu[item] = _price(price, f"{path}: {item!r}")
+    return menu, categories
+
+
+def _price(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{where}: invalid price {value!r}")
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{where}: invalid price {value!r}") from None
+
+
+def load_catalog(path=None):
+    """Load (menu, categories) dicts from a catalog file through the cache."""
+    record = _load_record(path or default_catalog_path())
+    names, starts = record["names"], record["starts"]
+    categories = {category: names[starts[i]:starts[i + 1]] for i, category in enumerate(record["category_names"])}
+    return {name: cents / 100 for name, cents in zip(names, record["cents"])}, categories
+
+
+def load_compact_catalog(path=None):
+    """Load a compact Catalog from a catalog file through the cache."""
+    return Catalog.from_record(_load_record(path or default_catalog_path()))
+
+
+def _load_record(path):
+    """Return the flat cache record for `path`, rebuilding the cache if stale.
+
+    The cache beside the catalog records the file's mtime, size and SHA-1.
+    If mtime and size still match, the source is not read at all; if only the
+    stat changed but the content hash matches, the cached data is reused. A
+    missing or unwritable cache just means parsing every time.
+    """
+    cache_path = path + CACHE_SUFFIX
+    st = os.stat(path)
+    cached = _read_cache(cache_path)
+    if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["size"] == st.st_size:
+        return cached
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if cached and cached["sha1"] == digest:
+        record = cached
+    else:
+        record = _build_record(*parse_catalog(data, path))
+    record.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha1=digest)
+    _write_cache(cache_path, record)
+    return record
+
+
+def _build_record(menu, categories):
+    # Items laid out in category order so each category is a contiguous
+    # range; flat lists load several times faster than the equivalent dicts
+    names, starts = [], [0]
+    for items in categories.values():
+        names.extend(items)
+        starts.append(len(names))
+    first_id = {}
+    for item_id, name in enumerate(names):
+        first_id.setdefault(name, item_id)
+    return {
+        "version": CACHE_VERSION,
+        "names": names,
+        "cents": [to_cents(menu[name]) for name in names],
+        "category_names": list(categories),
+        "starts": starts,
+        "by_name": [first_id[name] for name in sorted(first_id)],
+    }
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, "rb") as f:
+            cached = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+        return None
+    if any(key not in cached for key in CACHE_KEYS):
+        return None  # Truncated or hand-edited; treat as a miss
+    return cached
+
+
+def _write_cache(cache_path, cached):
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            marshal.dump(cached, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# --- Compact Catalog ---
+class MenuItem:
+    """One menu entry; the name is the catalog's own string object, not a copy."""
+
+    __slots__ = ("id", "name", "price_cents", "category")
+
+    def __init__(self, id, name, price_cents, category):
+        self.id = id
+        self.name = name
+        self.price_cents = price_cents
+        self.category = category
+
+    def __repr__(self):
+        return f"MenuItem({self.id}, {self.name!r}, ${format_cents(self.price_cents)}, {self.category!r})"
+
+
+class Catalog:
+    """Immutable menu stored column-wise for large, multi-location catalogs.
+
+    Items have integer ids in category order, so category c is the id range
+    starts[c]:starts[c + 1]. Prices are an array('q') of cents. Name lookup
+    bisects a name-sorted copy of the names list instead of keeping a dict,
+    which avoids a hash table and an int object per item. `menu`, `cents` and
+    `categories` are read-only mapping views for code written against the old
+    dicts.
+    """
+
+    def __init__(self, names, cents, category_names, starts, by_name):
+        self.names = names
+        self.cents_array = cents
+        self.category_names = category_names
+        self.starts = starts    # array('l'), len(category_names) + 1 entries
+        self.by_name = by_name  # array('l') of ids ordered by name
+        self.sorted_names = [names[i] for i in by_name]
+        self.menu = _MenuView(self)
+        self.cents = _CentsView(self)
+        self.categories = _CategoryView(self)
+
+    @classmethod
+    def from_record(cls, record):
+        """Build from a cache record without going through any dict."""
+        return cls(record["names"],
+                   array("q", record["cents"]),
+                   [sys.intern(category) for category in record["category_names"]],
+                   array("l", record["starts"]),
+                   array("l", record["by_name"]))
+
+    def __len__(self):
+        return len(self.names)
+
+    def id_of(self, name):
+        """Return the id of `name`; raises KeyError for unknown items."""
+        i = bisect_left(self.sorted_names, name)
+        if i < len(self.sorted_names) and self.sorted_names[i] == name:
+            return self.by_name[i]
+        raise KeyError(name)
+
+    def item(self, item_id):
+        """Materialise the MenuItem record for `item_id`."""
+        category = self.category_names[bisect_right(self.starts, item_id) - 1]
+        return MenuItem(item_id, self.names[item_id], self.cents_array[item_id], category)
+
+    def category_range(self, index):
+        return range(self.starts[index], self.starts[index + 1])
+
+    def items_in(self, category):
+        """Yield MenuItem records for one category by walking its id range."""
+        names, cents = self.names, self.cents_array
+        for item_id in self.category_range(self.category_names.index(category)):
+            yield MenuItem(item_id, names[item_id], cents[item_id], category)
+
+
+class _MenuView(Mapping):
+    """name -> price in dollars, like the old `menu` dict."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    def __getitem__(self, name):
+        return self.catalog.cents_array[self.catalog.id_of(name)] / 100
+
+    def __iter__(self):
+        # Category order, skipping repeats of an item listed in two categories
+        names = self.catalog.names
+        for item_id in sorted(self.catalog.by_name):
+            yield names[item_id]
+
+    def __len__(self):
+        return len(self.catalog.by_name)
+
+
+class _CentsView(_MenuView):
+    """name -> price in cents, usable directly as an Order price list."""
+
+    def __getitem__(self, name):
+        return self.catalog.cents_array[self.catalog.id_of(name)]
+
+
+class _CategoryView(Mapping):
+    """category -> list of item names, like the old `categories` dict."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.index = {name: i for i, name in enumerate(catalog.category_names)}
+
+    def __getitem__(self, category):
+        i = self.index[category]
+        return self.catalog.names[self.catalog.starts[i]:self.catalog.starts[i + 1]]
+
+    def __iter__(self):
+        return iter(self.catalog.category_names)
+
+    def __len__(self):
+        return len(self.catalog.category_names)
+
+
+class CatalogSnapshot:
+    """One immutable catalog version, swapped atomically by rebinding a reference."""
+
+    __slots__ = ("version", "catalog", "menu", "categories")
+
+    def __init__(self, version, catalog):
+        self.version = version
+        self.catalog = catalog
+        self.menu = catalog.menu
+        self.categories = catalog.categories
+
+    def diff(self, other):
+        """Return (changed_prices, structure_changed) going from self to `other`."""
+        old, new = self.catalog, other.catalog
+        structure_changed = old.names != new.names or old.category_names != new.category_names \
+            or old.starts != new.starts
+        if structure_changed:
+            changed = {name for name, cents in new.cents.items() if old.cents.get(name, cents) != cents}
+        else:
+            changed = {new.names[i] for i, (a, b) in enumerate(zip(old.cents_array, new.cents_array)) if a != b}
+        return changed, structure_changed
+
+
+class CatalogWatcher:
+    """Poll a catalog file's stat on the Tk loop and publish new snapshots.
+
+    Each poll is a single os.stat(); the file is only re-read (through the
+    marshal cache) when its mtime or size changes. `on_change(old, new)` is
+    called on the Tk thread after the new snapshot has been swapped in.
+    """
+
+    def __init__(self, root, on_change, path=None, interval_ms=2000):
+        self.root = root
+        self.on_change = on_change
+        self.path = path or default_catalog_path()
+        self.interval_ms = interval_ms
+        self.stat_key = self._stat_key()
+        self.snapshot = CatalogSnapshot(1, load_compact_catalog(self.path))
+        self._poll_id = root.after(interval_ms, self._poll)
+
+    def _stat_key(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def _poll(self):
+        try:
+            key = self._stat_key()
+            if key != self.stat_key:
+                # Remember the stat first so a broken file is not re-parsed every poll
+                self.stat_key = key
+                self._reload()
+        except (OSError, ValueError, KeyError) as e:
+            if sys.stderr:
+                print(f"Catalog reload skipped: {e}", file=sys.stderr)
+        finally:
+            # Keep watching whatever went wrong, or hot reload stops for the session
+            self._poll_id = self.root.after(self.interval_ms, self._poll)
+
+    def _reload(self):
+        old = self.snapshot
+        self.snapshot = CatalogSnapshot(old.version + 1, load_compact_catalog(self.path))
+        self.on_change(old, self.snapshot)
+
+    def stop(self):
+        self.root.after_cancel(self._poll_id)
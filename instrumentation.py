@@ -0,0 +1,191 @@
+import functools
+import heapq
+import json
+import os
+import threading
+import time
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+
+class Tracer:
+    """Callback timings kept in a fixed-size in-memory ring buffer.
+
+    Each event is (name, start_ns, duration_ns, thread id). Recording is off
+    by default; while it is off the only cost on a traced call is one
+    attribute check. The buffer is a deque with maxlen, so appends from the
+    I/O worker thread need no lock and old events simply fall off the end.
+    """
+
+    def __init__(self, capacity=4096, enabled=False):
+        self.enabled = enabled
+        self.events = deque(maxlen=capacity)
+        self.origin_ns = time.perf_counter_ns()
+
+    def record(self, name, start_ns, end_ns):
+        self.events.append((name, start_ns, end_ns - start_ns, threading.get_ident()))
+
+    def clear(self):
+        self.events.clear()
+
+    def slowest(self, n=20):
+        """The `n` longest events still in the buffer, longest first."""
+        return heapq.nlargest(n, list(self.events), key=lambda event: event[2])
+
+    def chrome_trace(self):
+        """Return the buffer as a Chrome trace-event dict (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        events = []
+        for tid in {event[3] for event in self.events}:
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": thread_names.get(tid, str(tid))}})
+        for name, start_ns, duration_ns, tid in list(self.events):
+            events.append({"name": name, "cat": "callback", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": (start_ns - self.origin_ns) / 1000, "dur": duration_ns / 1000})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+TRACER = Tracer(enabled=bool(os.environ.get("CAFE_TRACE")))
+
+
+def traced(fn=None, name=None):
+    """Decorator recording each call of `fn` in TRACER while tracing is on."""
+    if fn is None:
+        return functools.partial(traced, name=name)
+    label = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not TRACER.enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            TRACER.record(label, start, time.perf_counter_ns())
+    wrapper.__traced__ = True  # Lets the Tk hook leave it to record itself
+    return wrapper
+
+
+# --- Tk callback hook ---
+def callback_name(func):
+    """Readable name for a Tk callback, looking through Misc.after's wrapper."""
+    func = getattr(func, "__func__", func)
+    code = getattr(func, "__code__", None)
+    if code and code.co_name == "callit" and "func" in code.co_freevars:
+        inner = func.__closure__[code.co_freevars.index("func")].cell_contents
+        return f"after {callback_name(inner)}"
+    return getattr(func, "__qualname__", None) or type(func).__name__
+
+
+class _TracedCallWrapper(tk.CallWrapper):
+    """tkinter's CallWrapper, timing the callback when tracing is on.
+
+    Callbacks that are @traced already record themselves under the same
+    name, so they are passed straight through rather than recorded twice.
+    """
+
+    name = None
+
+    def __call__(self, *args):
+        if not TRACER.enabled:
+            return super().__call__(*args)
+        if self.name is None:
+            traced_already = getattr(getattr(self.func, "__func__", self.func), "__traced__", False)
+            self.name = "" if traced_already else callback_name(self.func)
+        if not self.name:
+            return super().__call__(*args)
+        start = time.perf_counter_ns()
+        try:
+            return super().__call__(*args)
+        finally:
+            TRACER.record(self.name, start, time.perf_counter_ns())
+
+
+def install_tk_hook():
+    """Time every Tk callback (commands, bindings, after, variable traces).
+
+    tkinter wraps each Python callback in CallWrapper when it is registered,
+    so this must run before the widgets are created.
+    """
+    tk.CallWrapper = _TracedCallWrapper
+
+
+# --- Debug panel ---
+class DebugPanel:
+    """Hidden window listing the slowest recent callbacks.
+
+    Toggled with Ctrl+Shift+D on `root`. Refreshes once a second while open.
+    """
+
+    def __init__(self, root, tracer=TRACER, rows=25, refresh_ms=1000):
+        self.root = root
+        self.tracer = tracer
+        self.rows = rows
+        self.refresh_ms = refresh_ms
+        self.window = None
+        self._refresh_id = None
+        root.bind_all("<Control-Shift-D>", lambda event: self.toggle())
+
+    def toggle(self):
+        if self.window:
+            self.close()
+        else:
+            self.open()
+
+    def open(self):
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Callback Timings")
+        self.window.geometry("520x420")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        controls = ttk.Frame(self.window)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        self.enabled_var = tk.BooleanVar(value=self.tracer.enabled)
+        ttk.Checkbutton(controls, text="Record", variable=self.enabled_var,
+                        command=lambda: setattr(self.tracer, "enabled", self.enabled_var.get())).pack(side=tk.LEFT)
+        ttk.Button(controls, text="Clear", command=self.clear).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Export Trace...", command=self.export).pack(side=tk.LEFT)
+
+        self.listbox = tk.Listbox(self.window, font=("Courier", 10))
+        self.listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.refresh()
+
+    def close(self):
+        if self._refresh_id:
+            self.root.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        self.window.destroy()
+        self.window = None
+
+    def clear(self):
+        self.tracer.clear()
+        self.refresh()
+
+    def refresh(self):
+        # Called by clear() too: cancel the pending tick so only one loop ever runs
+        if self._refresh_id:
+            self.root.after_cancel(self._refresh_id)
+            self._refresh_id = None
+        if not self.window:
+            return
+        now = time.perf_counter_ns()
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, f"{'ms':>9}  {'ago (s)':>8}  callback")
+        for name, start_ns, duration_ns, _ in self.tracer.slowest(self.rows):
+            self.listbox.insert(tk.END, f"{duration_ns / 1e6:>9.2f}  {(now - start_ns) / 1e9:>8.1f}  {name}")
+        self._refresh_id = self.root.after(self.refresh_ms, self.refresh)
+
+    def export(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".json",
+                                            initialfile="cafe-trace.json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            self.tracer.export(path)
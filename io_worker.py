@@ -0,0 +1,95 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class IOWorker:
+    """Background thread for blocking I/O jobs, reporting back on the Tk loop.
+
+    Jobs are plain callables placed on a bounded queue. Each one is retried
+    with exponential backoff before it is reported as failed, except for
+    exceptions listed in `no_retry`, which fail the job at once. Results are
+    handed to the Tk thread through a second queue that is drained by
+    root.after() polling, so callbacks always run on the main thread.
+
+    `on_idle()`, if given, runs on the worker thread whenever it has waited
+    `idle_s` seconds without a job, e.g. to sync a journal after the last
+    write of a busy spell.
+    """
+
+    def __init__(self, root, max_pending=64, attempts=5, backoff=0.5, max_backoff=8.0, poll_ms=50,
+                 on_idle=None, idle_s=1.0, no_retry=()):
+        self.root = root
+        self.no_retry = no_retry
+        self.on_idle = on_idle
+        self.idle_s = idle_s
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="io-worker", daemon=True)
+        self.thread.start()
+        self._poll_id = root.after(poll_ms, self._poll)
+
+    def submit(self, job, on_success=None, on_error=None, attempts=None):
+        """Queue `job()`; raises queue.Full when the worker is saturated.
+
+        on_success(result) or on_error(exception) is called on the Tk thread.
+        Pass attempts=1 for jobs that are not safe to repeat.
+        """
+        self.jobs.put_nowait((job, on_success, on_error, attempts or self.attempts))
+
+    def stop(self, timeout=None):
+        """Finish queued jobs, then deliver their results and stop polling."""
+        self.jobs.put(_STOP)
+        self.thread.join(timeout)
+        self.root.after_cancel(self._poll_id)
+        self._drain()
+
+    def _run(self):
+        while True:
+            try:
+                entry = self.jobs.get(timeout=self.idle_s if self.on_idle else None)
+            except queue.Empty:
+                try:
+                    self.on_idle()
+                except Exception as e:
+                    logger.warning(f"Idle job failed: {e}")
+                continue
+            if entry is _STOP:
+                return
+            job, on_success, on_error, attempts = entry
+            delay = self.backoff
+            for attempt in range(1, attempts + 1):
+                try:
+                    result = job()
+                except Exception as e:
+                    logger.warning(f"I/O job failed (attempt {attempt}/{attempts}): {e}")
+                    if attempt == attempts or isinstance(e, self.no_retry):
+                        self.results.put((on_error, e))
+                        break
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff)
+                else:
+                    self.results.put((on_success, result))
+                    break
+
+    def _poll(self):
+        self._drain()
+        self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _drain(self):
+        while True:
+            try:
+                callback, value = self.results.get_nowait()
+            except queue.Empty:
+                return
+            if callback:
+                callback(value)
@@ -0,0 +1,225 @@
+import glob
+import itertools
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from billing import InvoiceRenderer
+from order import TAX_RATE_BP
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+INDEX_ENTRY = struct.Struct("<QQ")  # seq, byte offset in the segment
+
+
+def invoice_record(order, when):
+    """Snapshot an Order as a journal record (unit prices are kept per line).
+
+    The random "key" makes retried appends of the same invoice idempotent.
+    """
+    return {
+        "key": uuid.uuid4().hex,
+        "ts": when.strftime(DATE_FORMAT),
+        "tax_bp": order.tax_rate_bp,
+        "lines": [[item, qty, order.unit_price(item)] for item, qty in order.items()],
+    }
+
+
+def render_record(record):
+    """Regenerate the plain-text invoice for a journal record."""
+    prices = {item: unit for item, _, unit in record["lines"]}
+    renderer = InvoiceRenderer(prices, record.get("tax_bp", TAX_RATE_BP))
+    when = datetime.strptime(record["ts"], DATE_FORMAT)
+    return renderer.render([(item, qty) for item, qty, _ in record["lines"]], when)
+
+
+class InvoiceJournal:
+    """Append-only JSON-lines invoice journal.
+
+    Each invoice is one line appended to the current segment file, which
+    rotates once it passes `max_segment_bytes`. A sidecar .idx file per
+    segment maps sequence numbers to byte offsets so any invoice can be read
+    back with one seek. Appends are flushed to the OS immediately but only
+    fsynced every `fsync_every` records or `fsync_interval` seconds, and on
+    sync()/close(). Call sync_if_due() periodically so the last appends
+    before a quiet spell are not left waiting for the next one. Appending a
+    record whose "key" was already appended by this instance returns the
+    earlier sequence number instead of writing it twice, so a failed append
+    can be retried safely. Methods are safe to call from several threads.
+
+    With `read_only` the journal is opened for reading only: nothing is
+    created, repaired or truncated, so it is safe to use on a live journal
+    (e.g. for reports) while a till is appending to it.
+    """
+
+    def __init__(self, directory="invoice_journal", max_segment_bytes=16 * 1024 * 1024,
+                 fsync_every=32, fsync_interval=1.0, read_only=False):
+        self.directory = directory
+        self.read_only = read_only
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.index = []  # index[seq - 1] = (segment number, offset)
+        self.keys = {}   # record key -> seq, for records appended by this instance
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.RLock()
+        if not read_only:
+            os.makedirs(directory, exist_ok=True)
+
+        segments = sorted(int(os.path.basename(p)[8:14]) for p in glob.glob(os.path.join(directory, "journal-*.jsonl")))
+        for segment in segments:
+            self._load_segment(segment)
+        self.segment = segments[-1] if segments else 1
+        if not read_only:
+            self._open_segment(self.segment)
+
+    # --- Paths ---
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"journal-{segment:06d}.jsonl")
+
+    def _index_path(self, segment):
+        return os.path.join(self.directory, f"journal-{segment:06d}.idx")
+
+    # --- Opening and recovery ---
+    def _load_segment(self, segment):
+        entries = []
+        if os.path.exists(self._index_path(segment)):
+            with open(self._index_path(segment), "rb") as f:
+                data = f.read()
+            data = data[:len(data) - len(data) % INDEX_ENTRY.size]
+            entries = [offset for _, offset in INDEX_ENTRY.iter_unpack(data)]
+
+        # Re-check the last indexed record, re-index anything written after it,
+        # and drop a torn trailing record left by a crash mid-write. Read-only
+        # opens just skip the torn record: it may be an append in progress.
+        size = os.path.getsize(self._segment_path(segment))
+        entries = [offset for offset in entries if offset < size]
+        start = entries.pop() if entries else 0
+        with open(self._segment_path(segment), "rb" if self.read_only else "rb+") as f:
+            f.seek(start)
+            recovered = []
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    if line and not self.read_only:
+                        f.truncate(offset)
+                    break
+                recovered.append(offset)
+        if recovered and not self.read_only:
+            with open(self._index_path(segment), "wb") as f:
+                for seq, offset in enumerate(entries + recovered, start=len(self.index) + 1):
+                    f.write(INDEX_ENTRY.pack(seq, offset))
+        self.index.extend((segment, offset) for offset in entries + recovered)
+
+    def _open_segment(self, segment):
+        self.segment = segment
+        self.data_file = open(self._segment_path(segment), "ab")
+        self.index_file = open(self._index_path(segment), "ab")
+
+    # --- Writing ---
+    def append(self, record):
+        """Append `record`, returning its sequence number."""
+        if self.read_only:
+            raise ValueError("Journal is open read-only")
+        with self.lock:
+            seq = self.keys.get(record.get("key"))
+            if seq is not None:
+                # Written by an earlier attempt whose sync failed; make sure it is on disk now
+                if self.unsynced:
+                    self.sync()
+                return seq
+            if self.data_file.tell() >= self.max_segment_bytes:
+                self._rotate()
+            seq = len(self.index) + 1
+            record = dict(record, seq=seq)
+            offset = self.data_file.tell()
+            self.data_file.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.data_file.flush()
+            self.index_file.write(INDEX_ENTRY.pack(seq, offset))
+            self.index.append((self.segment, offset))
+            if "key" in record:
+                self.keys[record["key"]] = seq
+
+            self.unsynced += 1
+            if self.unsynced >= self.fsync_every or time.monotonic() - self.last_sync >= self.fsync_interval:
+                self.sync()
+            return seq
+
+    def sync(self):
+        """Force everything appended so far onto disk."""
+        with self.lock:
+            self.index_file.flush()
+            os.fsync(self.data_file.fileno())
+            os.fsync(self.index_file.fileno())
+            self.unsynced = 0
+            self.last_sync = time.monotonic()
+
+    def sync_if_due(self):
+        """Sync if appends have been waiting `fsync_interval` seconds; returns whether it did."""
+        with self.lock:
+            if self.read_only or not self.unsynced or time.monotonic() - self.last_sync < self.fsync_interval:
+                return False
+            self.sync()
+            return True
+
+    def _rotate(self):
+        self.sync()
+        self.data_file.close()
+        self.index_file.close()
+        self._open_segment(self.segment + 1)
+
+    def close(self):
+        if self.read_only:
+            return
+        with self.lock:
+            self.sync()
+            self.data_file.close()
+            self.index_file.close()
+
+    # --- Reading ---
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, seq):
+        """Return the record with sequence number `seq`."""
+        with self.lock:
+            if not 1 <= seq <= len(self.index):
+                raise KeyError(seq)
+            segment, offset = self.index[seq - 1]
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def records(self, start=1, batch=1024):
+        """Yield records from `start` onwards, reading each segment sequentially.
+
+        Each segment is read in one go and decoded `batch` lines per
+        json.loads call, which is several times faster than a readline() and
+        json.loads() per record on large journals.
+        """
+        with self.lock:
+            entries = self.index[start - 1:]
+        for segment, group in itertools.groupby(entries, key=lambda entry: entry[0]):
+            offsets = [offset for _, offset in group]
+            with open(self._segment_path(segment), "rb") as f:
+                f.seek(offsets[0])
+                # Only the indexed records: a later append may be in progress
+                lines = f.read().split(b"\n", len(offsets))[:len(offsets)]
+            for i in range(0, len(lines), batch):
+                yield from json.loads(b"[" + b",".join(lines[i:i + batch]) + b"]")
+
+    def render_text(self, seq):
+        """Regenerate the plain-text invoice for `seq`."""
+        return render_record(self.get(seq))
+
+
+if __name__ == "__main__":
+    # Reprint: python journal.py <journal dir> <seq>
+    journal = InvoiceJournal(sys.argv[1], read_only=True)
+    print(journal.render_text(int(sys.argv[2])))
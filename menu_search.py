@@ -0,0 +1,85 @@
+GRAM_SIZE = 3
+
+
+class MenuSearchIndex:
+    """Substring search over menu item names backed by an n-gram index.
+
+    Every substring of up to GRAM_SIZE characters maps to the ids of the items
+    containing it. Longer queries intersect the posting sets of their n-grams
+    and verify the survivors. When a query extends the previous one, the
+    previous result set is narrowed instead of going back to the index.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.lowered = [name.lower() for name in self.names]
+        self.grams = {}
+        for item_id, name in enumerate(self.lowered):
+            for size in range(1, GRAM_SIZE + 1):
+                for start in range(len(name) - size + 1):
+                    self.grams.setdefault(name[start:start + size], set()).add(item_id)
+        self.last_query = ""
+        self.last_ids = range(len(self.names))
+
+    def search(self, query):
+        """Return the ids of matching items, in menu order."""
+        query = query.lower()
+        if not query:
+            ids = range(len(self.names))
+        elif self.last_query and self.last_query in query:
+            # Anything matching the longer query also matched the shorter one
+            lowered = self.lowered
+            ids = [i for i in self.last_ids if query in lowered[i]]
+        else:
+            ids = self._lookup(query)
+        self.last_query = query
+        self.last_ids = ids
+        return ids
+
+    def search_names(self, query):
+        """Return the set of matching item names."""
+        names = self.names
+        return {names[i] for i in self.search(query)}
+
+    def _lookup(self, query):
+        if len(query) <= GRAM_SIZE:
+            return sorted(self.grams.get(query, ()))
+        postings = []
+        for start in range(len(query) - GRAM_SIZE + 1):
+            posting = self.grams.get(query[start:start + GRAM_SIZE])
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        lowered = self.lowered
+        return sorted(i for i in candidates if query in lowered[i])
+
+
+class DebouncedSearch:
+    """Run a search callback once typing pauses, dropping superseded requests."""
+
+    def __init__(self, root, callback, delay_ms=150):
+        self.root = root
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.pending = None
+
+    def schedule(self, *args):
+        """Restart the countdown; usable directly as a StringVar trace callback."""
+        self.cancel()
+        self.pending = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+            self.pending = None
+
+    def flush(self):
+        """Run any pending search immediately (e.g. on Enter)."""
+        self.cancel()
+        self.callback()
+
+    def _fire(self):
+        self.pending = None
+        self.callback()
@@ -0,0 +1,157 @@
+from tkinter import ttk
+
+# --- Row kinds ---
+HEADER = "header"
+ITEM = "item"
+
+ROW_HEIGHT = 30
+OFFSCREEN_Y = -10 * ROW_HEIGHT  # Above the scrollregion, never visible
+
+
+def build_rows(categories):
+    """Flatten categories into ("header", category) / ("item", name) rows."""
+    rows = []
+    for category, items in categories.items():
+        rows.append((HEADER, category))
+        rows.extend((ITEM, item) for item in items)
+    return rows
+
+
+class _Slot:
+    """One reusable row: a header label and an item button sharing a canvas window."""
+
+    def __init__(self, view):
+        self.header = ttk.Label(view.canvas, style="Category.TLabel")
+        self.button = ttk.Button(view.canvas, style="MenuItem.TButton", cursor=view.button_cursor,
+                                 command=lambda: view._on_slot_click(self))
+        self.window = view.canvas.create_window(0, OFFSCREEN_Y, anchor="nw", window=self.button)
+        self.kind = ITEM
+        self.row = None
+        self.index = None
+        self.width = None
+
+
+class VirtualMenuList:
+    """Menu list that only creates widgets for the rows visible in the canvas.
+
+    A small pool of slots is laid over the canvas and rebound to whichever rows
+    are in view as the user scrolls, so widget count and rebuild time depend on
+    the viewport height rather than on the size of the menu.
+    """
+
+    def __init__(self, canvas, scrollbar, item_text, on_click, row_height=ROW_HEIGHT, button_cursor=""):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.item_text = item_text  # name -> button text
+        self.on_click = on_click    # name -> None
+        self.row_height = row_height
+        self.button_cursor = button_cursor
+        self.all_rows = []
+        self.rows = []
+        self.visible = None
+        self.slots = []
+        self.empty_text = ""
+        self.empty_label = ttk.Label(canvas, foreground="red")
+        self.empty_window = canvas.create_window(10, OFFSCREEN_Y, anchor="nw", window=self.empty_label)
+
+        canvas.configure(yscrollcommand=self._on_scroll, yscrollincrement=row_height)
+        canvas.bind("<Configure>", lambda e: self.refresh())
+
+    def set_rows(self, rows, empty_text="No items found matching your search."):
+        """Replace the full row model and show every row."""
+        self.all_rows = rows
+        self.visible = None
+        self.empty_text = empty_text
+        self._show(rows)
+
+    def apply_filter(self, visible=None):
+        """Show only the items in `visible` (None shows everything).
+
+        Category headers with no visible items collapse. Slots whose row did
+        not change keep their widgets untouched, so only rows that appear or
+        disappear in the viewport are reconfigured.
+        """
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if visible is None:
+            self._show(self.all_rows)
+            return
+        rows = []
+        pending_header = None
+        for row in self.all_rows:
+            if row[0] == HEADER:
+                pending_header = row
+            elif row[1] in visible:
+                if pending_header is not None:
+                    rows.append(pending_header)
+                    pending_header = None
+                rows.append(row)
+        self._show(rows)
+
+    def _show(self, rows):
+        self.rows = rows
+        self.canvas.configure(scrollregion=(0, 0, 0, len(rows) * self.row_height))
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def refresh_items(self, names):
+        """Re-render the visible rows for `names`, e.g. after a price change."""
+        for slot in self.slots:
+            if slot.row is not None and slot.row[0] == ITEM and slot.row[1] in names:
+                slot.row = None
+        self.refresh()
+
+    def refresh(self):
+        """Bind the slot pool to the rows currently inside the viewport."""
+        canvas = self.canvas
+        rh = self.row_height
+        first = max(0, int(canvas.canvasy(0)) // rh)
+        visible = max(canvas.winfo_height(), rh) // rh + 2
+        while len(self.slots) < visible:
+            self.slots.append(_Slot(self))
+
+        # Row i always lands in slot i % pool size, so scrolling by one row
+        # rebinds a single slot instead of shifting every slot's contents
+        width = max(canvas.winfo_width() - 20, 1)
+        pool = len(self.slots)
+        for index in range(first, first + pool):
+            slot = self.slots[index % pool]
+            if index < len(self.rows):
+                self._bind_slot(slot, index, self.rows[index], width)
+            elif slot.row is not None:
+                slot.row = slot.index = None
+                canvas.coords(slot.window, 0, OFFSCREEN_Y)
+
+        if self.rows:
+            canvas.coords(self.empty_window, 10, OFFSCREEN_Y)
+        else:
+            self.empty_label.configure(text=self.empty_text)
+            canvas.coords(self.empty_window, 10, 10)
+
+    def _bind_slot(self, slot, index, row, width):
+        if slot.row == row and slot.index == index and slot.width == width:
+            return
+        kind, value = row
+        if kind != slot.kind:
+            self.canvas.itemconfigure(slot.window, window=slot.header if kind == HEADER else slot.button)
+            slot.kind = kind
+        if kind == HEADER:
+            slot.header.configure(text=value)
+            self.canvas.coords(slot.window, 0, index * self.row_height)
+        else:
+            slot.button.configure(text=self.item_text(value))
+            self.canvas.coords(slot.window, 10, index * self.row_height)
+        if slot.width != width:
+            self.canvas.itemconfigure(slot.window, width=width)
+            slot.width = width
+        slot.row = row
+        slot.index = index
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def _on_slot_click(self, slot):
+        if slot.row is not None and slot.row[0] == ITEM:
+            self.on_click(slot.row[1])
@@ -0,0 +1,138 @@
+from collections import ChainMap
+
+TAX_RATE_BP = 800  # 8% in basis points
+
+
+def to_cents(amount):
+    """Convert a dollar float such as 6.5 to integer cents."""
+    return int(round(amount * 100))
+
+
+def compute_tax(subtotal_cents, tax_rate_bp=TAX_RATE_BP):
+    """Tax on a subtotal, rounded half up to the nearest cent."""
+    return (subtotal_cents * tax_rate_bp + 5000) // 10000
+
+
+def format_cents(cents):
+    """Render integer cents as a dollar string without the currency sign."""
+    sign = "-" if cents < 0 else ""
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+class Order:
+    """Order lines with a running subtotal kept in integer cents.
+
+    Adding, removing and changing a quantity are O(1) and adjust the subtotal
+    by the line's delta; tax and total are derived from it. Every change is
+    recorded so it can be undone. Listeners are called as listener(item) after
+    a single line changes, or listener(None) after the whole order changed.
+    """
+
+    def __init__(self, prices, tax_rate_bp=TAX_RATE_BP):
+        self.prices = prices  # item -> unit price in cents
+        self.tax_rate_bp = tax_rate_bp
+        self.quantities = {}
+        self.subtotal_cents = 0
+        self.listeners = []
+        self._undo = []  # (item, previous qty) or (None, previous quantities)
+
+    # --- Totals ---
+    @property
+    def tax_cents(self):
+        return compute_tax(self.subtotal_cents, self.tax_rate_bp)
+
+    @property
+    def total_cents(self):
+        return self.subtotal_cents + self.tax_cents
+
+    def unit_price(self, item):
+        return self.prices[item]
+
+    def line_total(self, item):
+        return self.prices[item] * self.quantities.get(item, 0)
+
+    # --- Price list ---
+    def reprice(self, prices):
+        """Switch to a new price list; only allowed while the order is empty.
+
+        Undo history is kept, so a cleared order can still be restored; it is
+        restored at the new prices, without items the new list no longer has.
+        """
+        if self.quantities:
+            raise ValueError("Cannot reprice an order that has items.")
+        self.prices = prices
+        history = []
+        for item, previous in self._undo:
+            if item is None:
+                history.append((None, {i: q for i, q in previous.items() if i in prices}))
+            elif item in prices:
+                history.append((item, previous))
+        self._undo = history
+
+    def add_prices(self, prices):
+        """Make items from `prices` orderable without repricing items already known."""
+        self.prices = ChainMap(self.prices, prices)
+
+    # --- Changes ---
+    def add(self, item, qty=1):
+        self.set_quantity(item, self.quantities.get(item, 0) + qty)
+
+    def remove(self, item):
+        self.set_quantity(item, 0)
+
+    def set_quantity(self, item, qty):
+        if qty < 0:
+            raise ValueError("Quantity cannot be negative.")
+        previous = self.quantities.get(item, 0)
+        if qty == previous:
+            return
+        price = self.prices[item]
+        self._undo.append((item, previous))
+        self._apply(item, previous, qty, price)
+        self._notify(item)
+
+    def clear(self):
+        if not self.quantities:
+            return
+        self._undo.append((None, self.quantities))
+        self.quantities = {}
+        self.subtotal_cents = 0
+        self._notify(None)
+
+    def undo(self):
+        """Revert the most recent change; returns False if there is nothing to undo."""
+        if not self._undo:
+            return False
+        item, previous = self._undo.pop()
+        if item is None:
+            self.quantities = previous
+            self.subtotal_cents = sum(self.prices[i] * q for i, q in previous.items())
+        else:
+            self._apply(item, self.quantities.get(item, 0), previous, self.prices[item])
+        self._notify(item)
+        return True
+
+    def _apply(self, item, previous, qty, price):
+        if qty:
+            self.quantities[item] = qty
+        else:
+            del self.quantities[item]
+        self.subtotal_cents += price * (qty - previous)
+
+    def _notify(self, item):
+        for listener in self.listeners:
+            listener(item)
+
+    # --- Read access ---
+    def items(self):
+        return self.quantities.items()
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def __contains__(self, item):
+        return item in self.quantities
+
+    def __getitem__(self, item):
+        return self.quantities[item]
@@ -0,0 +1,109 @@
+import tkinter as tk
+
+
+class OrderPanel:
+    """Current-order text box that edits one line per change instead of redrawing.
+
+    Each order line starts at a left-gravity text mark, so Tk keeps line
+    positions up to date as other lines are inserted or removed. The subtotal
+    footer is a running value adjusted by the delta of each line change.
+    """
+
+    def __init__(self, text, header_lines, format_line, separator="-" * 50,
+                 format_subtotal=lambda subtotal: f"Subtotal: ${subtotal:.2f}",
+                 empty_text="Your order is empty."):
+        self.text = text
+        self.header_lines = header_lines
+        self.format_line = format_line  # (item, qty, line_total) -> str
+        self.separator = separator
+        self.format_subtotal = format_subtotal
+        self.empty_text = empty_text
+        self.marks = {}        # item -> mark name at the start of its line
+        self.line_totals = {}  # item -> line total currently shown
+        self.subtotal = 0
+        self._next_mark = 0
+
+    def reset(self, lines=()):
+        """Redraw from scratch; `lines` is an iterable of (item, qty, line_total)."""
+        self._edit_begin()
+        for mark in self.marks.values():
+            self.text.mark_unset(mark)
+        self.marks.clear()
+        self.line_totals.clear()
+        self.subtotal = 0
+        self.text.delete("1.0", tk.END)
+        lines = list(lines)
+        if lines:
+            self._draw_skeleton()
+            for item, qty, line_total in lines:
+                self._append(item, qty, line_total)
+            self._draw_subtotal()
+        else:
+            self.text.insert(tk.END, self.empty_text)
+        self._edit_end()
+
+    def set_line(self, item, qty, line_total):
+        """Show `item` at `qty`, rewriting its line or appending a new one."""
+        if qty <= 0:
+            self.remove_line(item)
+            return
+        self._edit_begin()
+        if not self.marks:
+            self.text.delete("1.0", tk.END)
+            self._draw_skeleton()
+        mark = self.marks.get(item)
+        if mark is None:
+            self._append(item, qty, line_total)
+        else:
+            self.text.delete(mark, f"{mark} lineend")
+            self.text.insert(mark, self.format_line(item, qty, line_total))
+            self.subtotal += line_total - self.line_totals[item]
+            self.line_totals[item] = line_total
+        self._draw_subtotal()
+        self._edit_end()
+
+    def remove_line(self, item):
+        mark = self.marks.pop(item, None)
+        if mark is None:
+            return
+        if not self.marks:
+            self.marks[item] = mark  # Let reset() release it
+            self.reset()
+            return
+        self._edit_begin()
+        self.text.delete(mark, f"{mark} lineend +1c")
+        self.text.mark_unset(mark)
+        self.subtotal -= self.line_totals.pop(item)
+        self._draw_subtotal()
+        self._edit_end()
+
+    def _append(self, item, qty, line_total):
+        mark = f"order_line_{self._next_mark}"
+        self._next_mark += 1
+        self.text.mark_set(mark, "order_footer")
+        self.text.mark_gravity(mark, tk.LEFT)
+        self.text.insert("order_footer", self.format_line(item, qty, line_total) + "\n")
+        self.marks[item] = mark
+        self.line_totals[item] = line_total
+        self.subtotal += line_total
+
+    def _draw_skeleton(self):
+        for line in self.header_lines:
+            self.text.insert(tk.END, line + "\n")
+        # Lines are inserted at order_footer, which is right-gravity and so stays
+        # below them; order_subtotal marks the running total line
+        footer = self.text.index("end -1c")
+        self.text.insert(tk.END, self.separator + "\n")
+        self.text.mark_set("order_footer", footer)
+        self.text.mark_set("order_subtotal", "end -1c")
+        self.text.mark_gravity("order_subtotal", tk.LEFT)
+
+    def _draw_subtotal(self):
+        self.text.delete("order_subtotal", "order_subtotal lineend")
+        self.text.insert("order_subtotal", self.format_subtotal(self.subtotal))
+
+    def _edit_begin(self):
+        self.text.config(state="normal")
+
+    def _edit_end(self):
+        self.text.config(state="disabled")
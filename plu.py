@@ -0,0 +1,89 @@
+import itertools
+import re
+from string import ascii_uppercase
+
+VOWELS = set("AEIOU")
+STOP_WORDS = {"AND", "OF", "THE", "WITH"}
+
+# "3*PZ2", "PZ2*3" or just "PZ2"
+ENTRY_RE = re.compile(r"^(?:(\d+)\*)?([A-Z]+\d+)(?:\*(\d+))?$")
+
+
+def _prefix_candidates(category):
+    """Yield two-letter prefixes for a category, most readable first."""
+    words = [w for w in re.findall(r"[A-Z]+", category.upper()) if w not in STOP_WORDS]
+    if len(words) > 1:
+        yield words[0][0] + words[1][0]
+    word = words[0] if words else "X"
+    rest = word[1:]
+    for ch in rest:
+        if ch not in VOWELS:
+            yield word[0] + ch
+    for ch in rest:
+        yield word[0] + ch
+
+
+def _first_letter(category):
+    return (re.findall(r"[A-Z]", category.upper()) or ["X"])[0]
+
+
+def _fallback_prefixes(first):
+    """Yield longer letter-only prefixes (e.g. CAA, CAB) once the two-letter ones run out.
+
+    Prefixes must stay letters only so the digits of a code are always the
+    position: a digit in the prefix would let "C7" + 11 and "C71" + 1 collide.
+    """
+    for length in itertools.count(2):
+        for letters in itertools.product(ascii_uppercase, repeat=length):
+            yield first + "".join(letters)
+
+
+class PLUIndex:
+    """Short item codes (category prefix + position, e.g. PZ2) for keyed entry.
+
+    Codes are assigned once from the category layout and kept in a hash index,
+    so resolving a typed code is a single dict lookup.
+    """
+
+    def __init__(self, categories):
+        self.codes = {}    # code -> item
+        self.code_of = {}  # item -> code
+        used = set()
+        fallbacks = {}  # first letter -> its fallback sequence, resumed where the last category left it
+        for category, items in categories.items():
+            prefix = next((p for p in _prefix_candidates(category) if p not in used), None)
+            if prefix is None:
+                first = _first_letter(category)
+                sequence = fallbacks.setdefault(first, _fallback_prefixes(first))
+                prefix = next(p for p in sequence if p not in used)
+            used.add(prefix)
+            for position, item in enumerate(items, start=1):
+                code = f"{prefix}{position}"
+                assert code not in self.codes, f"PLU code {code} assigned twice"
+                self.codes[code] = item
+                self.code_of[item] = code
+
+    def resolve(self, code):
+        return self.codes.get(code.upper())
+
+    def parse(self, text):
+        """Parse a command line such as "3*PZ2 BV4" into [(item, qty), ...].
+
+        Raises ValueError naming the first bad token; nothing is returned
+        for a partly valid line so it can be committed all or nothing.
+        """
+        lines = []
+        for token in re.split(r"[\s,;]+", text.strip().upper()):
+            if not token:
+                continue
+            match = ENTRY_RE.match(token)
+            item = match and self.codes.get(match.group(2))
+            if not item:
+                raise ValueError(f"Unknown item code '{token}'.")
+            if match.group(1) and match.group(3):
+                raise ValueError(f"Give the quantity once in '{token}'.")
+            qty = int(match.group(1) or match.group(3) or 1)
+            if qty <= 0:
+                raise ValueError(f"Invalid quantity in '{token}'.")
+            lines.append((item, qty))
+        return lines
@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import itertools
+import json
+import queue
+import socket
+import threading
+import time
+
+from pos_server import DEFAULT_HOST, DEFAULT_PORT, Blocking, PosError
+
+# Safe to resend on a fresh connection if a pooled one turns out to be dead
+READ_ONLY_OPS = {"ping", "menu", "get", "orders", "recent_invoices", "invoice_text"}
+
+
+def parse_address(text):
+    """"host:port", ":port" or "host" -> (host, port)."""
+    host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+    return host or DEFAULT_HOST, int(port) if port else DEFAULT_PORT
+
+
+class _Connection:
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, payload):
+        self.sock.sendall(payload)
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class PosClient:
+    """Thread-safe client for PosServer with a pool of persistent connections.
+
+    Each call borrows an idle connection (or opens one, up to `pool_size`),
+    sends one JSON line and reads the reply, so a till pays the TCP handshake
+    once rather than per request. Raises PosError for refused requests and
+    ConnectionError/OSError when the server cannot be reached.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=4, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.ids = itertools.count(1)
+
+    def call(self, op, **args):
+        request_id = next(self.ids)
+        payload = json.dumps(dict(args, id=request_id, op=op), ensure_ascii=False).encode("utf-8") + b"\n"
+        with self.slots:
+            try:
+                conn = self.idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = _Connection(self.host, self.port, self.timeout)
+                reused = False
+            try:
+                reply = conn.request(payload)
+            except (OSError, ValueError):
+                conn.close()
+                if not (reused and op in READ_ONLY_OPS):
+                    raise
+                conn = _Connection(self.host, self.port, self.timeout)
+                reply = conn.request(payload)
+            self.idle.put(conn)
+        if reply.get("id") != request_id:
+            raise ConnectionError(f"Reply {reply.get('id')} does not match request {request_id}")
+        if not reply["ok"]:
+            raise PosError(reply["error"])
+        return reply["result"]
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class LocalPosClient:
+    """Stand-in for PosClient that calls a PosState in this process.
+
+    Results go through a JSON round trip so they look exactly like what a
+    networked till receives.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.lock = threading.Lock()
+
+    def call(self, op, **args):
+        with self.lock:
+            result = self.state.handle(dict(args, op=op))
+            if isinstance(result, Blocking):
+                try:
+                    result = result.fn()
+                except Exception as e:
+                    if result.on_error:
+                        result.on_error(e)
+                    raise PosError(f"Server I/O error: {e}")
+        return json.loads(json.dumps(result))
+
+    def close(self):
+        pass
+
+
+# --- Thin-client order ---
+class RemoteOrder:
+    """An Order held on the POS server, with a local mirror for display.
+
+    Offers the same interface CafeApp uses on Order. Every change is sent to
+    the server and the mirror is replaced with the state it returns, so
+    other tills' changes to a shared order show up on the next change or
+    sync(). Listeners are called like Order's: with the item when only that
+    line changed, otherwise with None.
+
+    By default requests are made inline. Set `run` to run(job, on_done) to
+    make them elsewhere, e.g. on CafeApp's I/O worker so the Tk thread never
+    waits on the network; on_done(state) must then be called on the thread
+    that owns the listeners, and changes return before they are applied.
+    """
+
+    def __init__(self, client, order_id=None, prices=None, run=None):
+        self.client = client
+        self.run = run
+        self.prices = prices if prices is not None else {}
+        self.listeners = []
+        self.quantities = {}
+        self.unit_prices = {}
+        self.subtotal_cents = 0
+        self.tax_rate_bp = 0
+        self.tax_cents = 0
+        self.total_cents = 0
+        self._apply(client.call("open", order=order_id))
+
+    def _apply(self, state):
+        self.order_id = state["order"]
+        self.tax_rate_bp = state["tax_bp"]
+        quantities = {item: qty for item, qty, _ in state["lines"]}
+        changed = {item for item in quantities.keys() | self.quantities.keys()
+                   if quantities.get(item) != self.quantities.get(item)}
+        self.quantities = quantities
+        self.unit_prices = {item: unit for item, _, unit in state["lines"]}
+        self.subtotal_cents = state["subtotal"]
+        self.tax_cents = state["tax"]
+        self.total_cents = state["total"]
+        return changed
+
+    def _change(self, op, item=None, **args):
+        if item is not None:
+            args["item"] = item
+        order_id = self.order_id
+
+        def job():
+            return self.client.call(op, order=order_id, **args)
+        if self.run is None:
+            return self._changed(item, job())
+        self.run(job, lambda state: self._changed(item, state))
+
+    def _changed(self, item, state):
+        changed = self._apply(state)
+        if changed:
+            single = changed == {item}
+            for listener in self.listeners:
+                listener(item if single else None)
+        return state
+
+    def unit_price(self, item):
+        return self.unit_prices.get(item, self.prices.get(item))
+
+    def line_total(self, item):
+        return self.unit_prices.get(item, 0) * self.quantities.get(item, 0)
+
+    def reprice(self, prices):
+        # The server reprices its orders; this only updates the local menu prices
+        self.prices = prices
+
+    def add_prices(self, prices):
+        self.prices = prices
+
+    def add(self, item, qty=1):
+        self._change("add", item, qty=qty)
+
+    def remove(self, item):
+        self._change("remove", item)
+
+    def set_quantity(self, item, qty):
+        if qty < 0:
+            raise ValueError("Quantity cannot be negative.")
+        self._change("set", item, qty=qty)
+
+    def clear(self):
+        self._change("clear")
+
+    def undo(self):
+        """Undo the last change on the server; returns whether it did, or None when run elsewhere."""
+        state = self._change("undo")
+        return state["undone"] if state else None
+
+    def sync(self):
+        """Fetch the server's current state of this order."""
+        self._change("get")
+
+    def items(self):
+        return self.quantities.items()
+
+    def __len__(self):
+        return len(self.quantities)
+
+    def __contains__(self, item):
+        return item in self.quantities
+
+    def __getitem__(self, item):
+        return self.quantities[item]
+
+
+def menu_from_server(menu):
+    """Turn a "menu" reply into (menu, categories, prices) like the local catalog."""
+    categories = {category: list(items) for category, items in menu["categories"].items()}
+    prices = {item: cents for items in menu["categories"].values() for item, cents in items.items()}
+    return {item: cents / 100 for item, cents in prices.items()}, categories, prices
+
+
+# --- Load test ---
+async def simulate_terminals(host, port, terminals=200, requests=100):
+    """Drive `terminals` concurrent tills, each adding items over its own connection.
+
+    Returns the per-request latencies in seconds.
+    """
+    latencies = []
+    menu_reader, menu_writer = await asyncio.open_connection(host, port)
+    menu_writer.write(b'{"id": 0, "op": "menu"}\n')
+    items = [item for category in json.loads(await menu_reader.readline())["result"]["categories"].values()
+             for item in category]
+    menu_writer.close()
+
+    async def terminal(n):
+        reader, writer = await asyncio.open_connection(host, port)
+        for i in range(requests):
+            op = {"op": "open", "order": f"sim-{n}"} if i == 0 else \
+                {"op": "add", "order": f"sim-{n}", "item": items[(n + i) % len(items)]}
+            start = time.perf_counter()
+            writer.write(json.dumps(dict(op, id=i)).encode("utf-8") + b"\n")
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if not reply["ok"]:
+                raise PosError(reply["error"])
+        writer.write(json.dumps({"id": requests, "op": "close", "order": f"sim-{n}"}).encode("utf-8") + b"\n")
+        await reader.readline()
+        writer.close()
+
+    await asyncio.gather(*(terminal(n) for n in range(terminals)))
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a POS server with simulated tills.")
+    parser.add_argument("--server", default=f"{DEFAULT_HOST}:{DEFAULT_PORT}", help="host:port")
+    parser.add_argument("--terminals", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=100, help="requests per terminal")
+    args = parser.parse_args(argv)
+
+    host, port = parse_address(args.server)
+    start = time.perf_counter()
+    latencies = sorted(asyncio.run(simulate_terminals(host, port, args.terminals, args.requests)))
+    elapsed = time.perf_counter() - start
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{len(latencies)} requests from {args.terminals} terminals in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:.0f}/s); p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+from datetime import datetime
+
+from billing import BillingEngine
+from catalog import CatalogSnapshot, default_catalog_path, load_compact_catalog
+from journal import InvoiceJournal, invoice_record, render_record
+from store import OrderStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+class PosError(Exception):
+    """A request the server refused; the message is sent back to the till."""
+
+
+class Blocking:
+    """Result of a handler that still has blocking I/O to do.
+
+    The server runs `fn()` on a worker thread so the event loop keeps serving
+    other tills; `on_error(exception)` then runs back on the loop thread.
+    """
+
+    def __init__(self, fn, on_error=None):
+        self.fn = fn
+        self.on_error = on_error
+
+
+class PosState:
+    """Menu, open orders and invoice numbering shared by every till.
+
+    Orders are keyed by a name such as a table ("T4") or a server-assigned
+    id. All order methods run on the event loop thread, one request at a
+    time, so they need no locking. Invoice numbers are the journal sequence
+    numbers, so they are unique across tills.
+    """
+
+    def __init__(self, catalog_path=None, journal_dir="invoice_journal", db_path="cafe.db"):
+        self.catalog_path = catalog_path or default_catalog_path()
+        self.stat_key = self._stat_key()
+        self.snapshot = CatalogSnapshot(1, load_compact_catalog(self.catalog_path))
+        self.billing = BillingEngine(self.snapshot.menu, self.snapshot.categories, prices=self.snapshot.catalog.cents)
+        self.orders = {}
+        self.next_order = 1
+        self.journal = InvoiceJournal(journal_dir)
+        self.store = OrderStore(db_path)
+        self.handlers = {
+            "ping": lambda: "pong",
+            "menu": self.menu,
+            "open": self.open,
+            "get": lambda order: self._state(order),
+            "orders": self.list_orders,
+            "add": self.add,
+            "set": self.set_quantity,
+            "remove": lambda order, item: self._mutate(order, lambda o: o.remove(item)),
+            "clear": lambda order: self._mutate(order, lambda o: o.clear()),
+            "undo": self.undo,
+            "close": self.close_order,
+            "invoice": self.invoice,
+            "recent_invoices": lambda limit=50: Blocking(lambda: self.store.recent_invoices(limit)),
+            "invoice_text": lambda seq: Blocking(lambda: self.journal.render_text(seq)),
+        }
+        self.signatures = {op: inspect.signature(handler) for op, handler in self.handlers.items()}
+
+    def handle(self, request):
+        """Run one request dict; returns a JSON-ready result or a Blocking."""
+        args = {key: value for key, value in request.items() if key not in ("id", "op")}
+        handler = self.handlers.get(request.get("op"))
+        if handler is None:
+            raise PosError(f"Unknown operation: {request.get('op')!r}")
+        try:
+            self.signatures[request["op"]].bind(**args)
+        except TypeError as e:
+            raise PosError(f"Bad arguments for {request['op']}: {e}")
+        return handler(**args)
+
+    def close(self):
+        self.store.close()
+        self.journal.close()
+
+    # --- Menu ---
+    def menu(self, version=None):
+        """The catalog as {category: {item: cents}}, or just the version if the till is current."""
+        if version == self.snapshot.version:
+            return {"version": version, "unchanged": True}
+        catalog = self.snapshot.catalog
+        return {
+            "version": self.snapshot.version,
+            "tax_bp": self.billing.tax_rate_bp,
+            "categories": {category: {item: catalog.cents[item] for item in items}
+                           for category, items in self.snapshot.categories.items()},
+        }
+
+    def _stat_key(self):
+        st = os.stat(self.catalog_path)
+        return st.st_mtime_ns, st.st_size
+
+    def reload_catalog(self):
+        """Pick up catalog edits; open orders keep the prices they started with."""
+        key = self._stat_key()
+        if key == self.stat_key:
+            return False
+        self.stat_key = key
+        self.snapshot = CatalogSnapshot(self.snapshot.version + 1, load_compact_catalog(self.catalog_path))
+        self.billing = BillingEngine(self.snapshot.menu, self.snapshot.categories, prices=self.snapshot.catalog.cents)
+        for order in self.orders.values():
+            if order:
+                order.add_prices(self.billing.prices)
+            else:
+                order.reprice(self.billing.prices)
+        return True
+
+    # --- Orders ---
+    def _order(self, order_id):
+        try:
+            return self.orders[order_id]
+        except KeyError:
+            raise PosError(f"No open order {order_id!r}")
+
+    @staticmethod
+    def _lines(order):
+        return [[item, qty, order.unit_price(item)] for item, qty in order.items()]
+
+    def _state(self, order_id):
+        order = self._order(order_id)
+        return {
+            "order": order_id,
+            "tax_bp": order.tax_rate_bp,
+            "lines": self._lines(order),
+            "subtotal": order.subtotal_cents,
+            "tax": order.tax_cents,
+            "total": order.total_cents,
+        }
+
+    def _mutate(self, order_id, change):
+        order = self._order(order_id)
+        if not order and order.prices is not self.billing.prices:
+            order.reprice(self.billing.prices)  # An emptied order moves to current prices
+        change(order)
+        return self._state(order_id)
+
+    def open(self, order=None):
+        """Open order `order` (e.g. a table) or a new numbered one; reopening joins it."""
+        if order is None:
+            order = f"O{self.next_order}"
+            self.next_order += 1
+        if order not in self.orders:
+            self.orders[order] = self.billing.new_order()
+        return self._state(order)
+
+    def list_orders(self):
+        return [{"order": order_id, "lines": len(order), "total": order.total_cents}
+                for order_id, order in self.orders.items()]
+
+    def add(self, order, item, qty=1):
+        self._check_line(item, qty, minimum=1)
+        return self._mutate(order, lambda o: o.add(item, qty))
+
+    def set_quantity(self, order, item, qty):
+        self._check_line(item, qty, minimum=0)
+        return self._mutate(order, lambda o: o.set_quantity(item, qty))
+
+    def _check_line(self, item, qty, minimum):
+        if item not in self.billing.prices:
+            raise PosError(f"Unknown item: {item!r}")
+        if not isinstance(qty, int) or qty < minimum:
+            raise PosError(f"Invalid quantity: {qty!r}")
+
+    def undo(self, order):
+        undone = self._order(order).undo()
+        return dict(self._state(order), undone=undone)
+
+    def close_order(self, order):
+        self._order(order)
+        del self.orders[order]
+        return None
+
+    # --- Invoices ---
+    def invoice(self, order, expect=None, key=None):
+        """Finalise `order` as the next invoice and start it afresh.
+
+        `expect` is the lines the till showed the cashier; if the shared
+        order no longer holds exactly those, the invoice is refused. `key`
+        identifies the invoice, so a till retrying after a lost reply gets
+        the first result back instead of a second invoice.
+
+        The order is replaced before the journal write so other tills see it
+        free at once; if the write fails the lines are put back, unless the
+        order has been used again in the meantime.
+        """
+        invoiced = self._order(order)
+        seq = self.journal.keys.get(key) if key else None
+        if seq is not None:
+            # Already journaled; a failed sync may have put the lines back
+            if invoiced and expect is not None and _same_lines(self._lines(invoiced), expect):
+                self.orders[order] = self.billing.new_order()
+
+            def replay():
+                self.journal.sync()
+                return {"seq": seq, "text": self.journal.render_text(seq)}
+            return Blocking(replay)
+
+        if not invoiced:
+            raise PosError("Order is empty")
+        if expect is not None and not _same_lines(self._lines(invoiced), expect):
+            raise PosError("Order was changed on another till; check it and invoice again")
+        record = invoice_record(invoiced, datetime.now())
+        if key:
+            record["key"] = key
+        self.orders[order] = fresh = self.billing.new_order()
+
+        def commit():
+            seq = self.journal.append(record)
+            self.store.save_invoice(record, seq)
+            return {"seq": seq, "text": render_record(record)}
+
+        def restore(error):
+            if self.orders.get(order) is fresh and not fresh:
+                self.orders[order] = invoiced
+        return Blocking(commit, restore)
+
+
+def _same_lines(lines, expect):
+    try:
+        return sorted(map(tuple, lines)) == sorted(map(tuple, expect))
+    except TypeError:
+        raise PosError(f"Invalid expected lines: {expect!r}")
+
+
+# --- Server ---
+class PosServer:
+    """asyncio TCP server speaking newline-delimited JSON.
+
+    A request is {"id": 1, "op": "add", "order": "T4", "item": "Latte", "qty": 2};
+    the reply is {"id": 1, "ok": true, "result": ...} or
+    {"id": 1, "ok": false, "error": "..."}. Each connection is persistent and
+    handles its requests in order; tills keep a small pool of them.
+    """
+
+    def __init__(self, state, host=DEFAULT_HOST, port=DEFAULT_PORT, reload_interval=2.0):
+        self.state = state
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.server = None
+        self._watcher = None
+        self._syncer = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port, limit=MAX_REQUEST_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]  # Resolves port 0
+        self._watcher = asyncio.create_task(self._watch_catalog())
+        self._syncer = asyncio.create_task(self._sync_journal())
+        logger.info(f"POS server listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self._watcher.cancel()
+        self._syncer.cancel()
+        self.server.close()
+        await self.server.wait_closed()
+        self.state.close()
+
+    async def _watch_catalog(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                if self.state.reload_catalog():
+                    logger.info(f"Catalog reloaded (version {self.state.snapshot.version})")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Catalog reload skipped: {e}")
+            except Exception:
+                # A bug in reloading must not end the task and freeze the menu until restart
+                logger.exception("Catalog reload failed")
+
+    async def _sync_journal(self):
+        # Appends only fsync on a later append, so sync the last ones of a busy spell here
+        journal = self.state.journal
+        while True:
+            await asyncio.sleep(journal.fsync_interval)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, journal.sync_if_due)
+            except OSError as e:
+                logger.warning(f"Journal sync failed: {e}")
+
+    async def _serve(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self.dispatch(line))
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            # ValueError: a request longer than MAX_REQUEST_BYTES
+            logger.debug(f"Dropping connection: {e}")
+        finally:
+            writer.close()
+
+    async def dispatch(self, line):
+        """Handle one request line and return the encoded reply line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            result = self.state.handle(request)
+            if isinstance(result, Blocking):
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(None, result.fn)
+                except Exception as e:
+                    if result.on_error:
+                        result.on_error(e)
+                    raise PosError(f"Server I/O error: {e}")
+            reply = {"id": request_id, "ok": True, "result": result}
+        except PosError as e:
+            reply = {"id": request_id, "ok": False, "error": str(e)}
+        except (ValueError, AttributeError) as e:
+            reply = {"id": request_id, "ok": False, "error": f"Malformed request: {e}"}
+        except Exception as e:
+            logger.exception("Request failed")
+            reply = {"id": request_id, "ok": False, "error": f"Internal error: {e}"}
+        return json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared order server for Café tills.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--catalog", help="menu.json or CSV catalog (default: next to this program)")
+    parser.add_argument("--journal", default="invoice_journal", help="invoice journal directory")
+    parser.add_argument("--db", default="cafe.db", help="SQLite order store")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = PosServer(PosState(args.catalog, args.journal, args.db), args.host, args.port)
+
+    async def run():
+        await server.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
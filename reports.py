@@ -0,0 +1,186 @@
+import gc
+import glob
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from billing import categories as menu_categories
+from journal import InvoiceJournal
+from order import format_cents, to_cents
+
+DATE_RE = re.compile(r"^Date:\s*(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+# Names longer than the 25-char column run straight into the quantity
+LINE_RE = re.compile(r"^(.+?)\s*(\d+)\s+\$(\d+\.\d{2})\s+\$(\d+\.\d{2})\s*$")
+UNCATEGORIZED = "Uncategorized"
+EPOCH = datetime(1970, 1, 1)
+SECOND = timedelta(seconds=1)
+
+
+def parse_invoice_text(text):
+    """Return (date, [(item, qty, unit_cents), ...]) from a saved invoice."""
+    when = None
+    lines = []
+    for row in text.splitlines():
+        if when is None:
+            match = DATE_RE.match(row)
+            if match:
+                when = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+            continue
+        if row.startswith("Subtotal"):
+            break
+        match = LINE_RE.match(row)
+        if match:
+            lines.append((match.group(1), int(match.group(2)), to_cents(float(match.group(3)))))
+    return when, lines
+
+
+def _codes(values):
+    """(distinct values in first-seen order, int32 array of each value's position in it)."""
+    ids = {value: i for i, value in enumerate(dict.fromkeys(values))}
+    return list(ids), np.fromiter(map(ids.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+def _epoch_seconds(stamps):
+    """Naive datetimes or "YYYY-MM-DD HH:MM:SS" strings -> int64 seconds since the epoch."""
+    if stamps and isinstance(stamps[0], str):
+        return np.array(stamps, dtype="datetime64[s]").astype(np.int64)  # Parsed in C
+    return np.fromiter(((when - EPOCH) // SECOND for when in stamps), dtype=np.int64, count=len(stamps))
+
+
+class SalesColumns:
+    """Order lines held as parallel NumPy columns.
+
+    item_id indexes `item_names`; timestamps are the invoice's wall-clock
+    time as seconds since the epoch, so hour-of-day is timestamp // 3600 % 24.
+    """
+
+    def __init__(self, item_names, item_id, qty, unit_cents, timestamp):
+        self.item_names = item_names
+        self.item_id = item_id
+        self.qty = qty
+        self.unit_cents = unit_cents
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_invoices(cls, invoices):
+        """Build columns from (when, [(item, qty, unit_cents), ...]) invoices.
+
+        `when` is a datetime or a "YYYY-MM-DD HH:MM:SS" string. Work is done
+        per invoice, not per line: each invoice's lines are transposed with
+        zip(), its timestamp is parsed once by NumPy and repeated over its
+        lines, and item ids are mapped in one pass at the end. The cyclic GC
+        is paused meanwhile: decoded records make no cycles, and its passes
+        over millions of short-lived lists cost as much as the decoding.
+        """
+        stamps, counts, names, qty, unit_cents = [], [], [], [], []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for when, lines in invoices:
+                if not lines:
+                    continue
+                line_names, line_qty, line_units = zip(*lines)
+                names.extend(line_names)
+                qty.extend(line_qty)
+                unit_cents.extend(line_units)
+                stamps.append(when)
+                counts.append(len(line_names))
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        item_names, item_id = _codes(names)
+        return cls(item_names, item_id,
+                   np.array(qty, dtype=np.int32),
+                   np.array(unit_cents, dtype=np.int64),
+                   np.repeat(_epoch_seconds(stamps), counts))
+
+    @classmethod
+    def from_records(cls, records):
+        """Build columns from (when, item, qty, unit_cents) records, one per line."""
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            records = list(records)
+            whens = [record[0] for record in records]
+            names = [record[1] for record in records]
+            qty = np.array([record[2] for record in records], dtype=np.int32)
+            unit_cents = np.array([record[3] for record in records], dtype=np.int64)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        # Lines of one invoice share its `when` object: convert once per run of them
+        ids = np.fromiter(map(id, whens), dtype=np.int64, count=len(whens))
+        starts = np.flatnonzero(np.diff(ids, prepend=-1))
+        timestamp = np.repeat(_epoch_seconds([whens[i] for i in starts]), np.diff(starts, append=len(whens)))
+        item_names, item_id = _codes(names)
+        return cls(item_names, item_id, qty, unit_cents, timestamp)
+
+    @classmethod
+    def from_invoice_files(cls, paths):
+        def invoices():
+            for path in paths:
+                # Invoices written on Windows are cp1252; only the digits matter here
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    when, lines = parse_invoice_text(f.read())
+                if when is not None:
+                    yield when, lines
+        return cls.from_invoices(invoices())
+
+    @classmethod
+    def from_journal(cls, journal):
+        return cls.from_invoices((record["ts"], record["lines"]) for record in journal.records())
+
+    def __len__(self):
+        return len(self.item_id)
+
+    # --- Aggregations ---
+    def revenue_cents(self):
+        return self.qty.astype(np.int64) * self.unit_cents
+
+    def revenue_by_item(self):
+        """Return {item: (qty, revenue_cents)}."""
+        n = len(self.item_names)
+        qty = np.bincount(self.item_id, weights=self.qty, minlength=n)
+        revenue = np.bincount(self.item_id, weights=self.revenue_cents(), minlength=n)
+        return {name: (int(qty[i]), int(round(revenue[i]))) for i, name in enumerate(self.item_names) if qty[i]}
+
+    def revenue_by_category(self, categories=menu_categories):
+        """Return {category: revenue_cents}, with unknown items under "Uncategorized"."""
+        names = list(categories) + [UNCATEGORIZED]
+        category_of = {item: i for i, items in enumerate(categories.values()) for item in items}
+        lookup = np.array([category_of.get(item, len(names) - 1) for item in self.item_names], dtype=np.int32)
+        revenue = np.bincount(lookup[self.item_id], weights=self.revenue_cents(), minlength=len(names))
+        return {name: int(round(revenue[i])) for i, name in enumerate(names) if revenue[i]}
+
+    def revenue_by_hour(self):
+        """Return a 24-element int64 array of revenue cents per hour of day."""
+        hours = (self.timestamp // 3600) % 24
+        return np.rint(np.bincount(hours, weights=self.revenue_cents(), minlength=24)).astype(np.int64)
+
+
+def format_report(columns, categories=menu_categories):
+    lines = [f"=== Sales Report ({len(columns)} order lines) ===", "", "By item:"]
+    by_item = sorted(columns.revenue_by_item().items(), key=lambda kv: -kv[1][1])
+    for item, (qty, revenue) in by_item:
+        lines.append(f"  {item:<30}{qty:>6}  ${format_cents(revenue)}")
+    lines += ["", "By category:"]
+    for category, revenue in columns.revenue_by_category(categories).items():
+        lines.append(f"  {category:<30}${format_cents(revenue)}")
+    lines += ["", "By hour:"]
+    for hour, revenue in enumerate(columns.revenue_by_hour()):
+        if revenue:
+            lines.append(f"  {hour:02d}:00{'':<25}${format_cents(int(revenue))}")
+    lines += ["", f"{'Total':<32}${format_cents(int(columns.revenue_cents().sum()))}"]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "."
+    if glob.glob(os.path.join(directory, "journal-*.jsonl")):
+        columns = SalesColumns.from_journal(InvoiceJournal(directory, read_only=True))
+    else:
+        columns = SalesColumns.from_invoice_files(sorted(glob.glob(os.path.join(directory, "invoice*.txt"))))
+    print(format_report(columns))
@@ -1,40 +1,63 @@
 import serial
 import serial.tools.list_ports
 import qrcode
-from PIL import Image, ImageTk
-import win32print
-import os
-import tempfile
-import threading
+from PIL import ImageTk
+import sys
 import tkinter as tk
 from tkinter import messagebox
-import time
 
+from label_pipeline import LabelPipeline
+from print_queue import FileSinkBackend, PrintQueue, WindowsPrinterBackend
+from qr_render import QR_CACHE
+from scan_reader import SerialSource
 
-def generate_qr_image(data, filename):
-    """Generate QR code image and save."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    img.save(filename)
+try:
+    import win32print
+except ImportError:  # Not on Windows: scanning still works, labels go to a file sink
+    win32print = None
 
+PREVIEW_SIZE = (150, 150)
 
-def print_image(filename):
-    """Send image to default Windows printer."""
+
+def generate_qr_image(data, filename=None):
+    """Generate a QR code as an in-memory PIL image; saved only if `filename` is given.
+
+    Images come from the shared LRU cache, so reprints skip QR encoding.
+    Treat the returned image as read-only.
+    """
+    img = QR_CACHE.image(data, version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    if filename:
+        img.save(filename)
+    return img
+
+
+def print_image(img):
+    """Print one PIL image on the default Windows printer as its own job, with no temp file."""
+    if win32print is None:
+        return "Print error: printing needs Windows with pywin32 installed"
     try:
-        printer_name = win32print.GetDefaultPrinter()
-        os.startfile(filename, "print")
-        return f"Printed to {printer_name}"
+        return WindowsPrinterBackend().submit(img, "QR label")
     except Exception as e:
         return f"Print error: {e}"
 
 
+def default_print_backend():
+    """The Windows default printer, or PNG files in ./printed_labels elsewhere."""
+    if win32print is None:
+        return FileSinkBackend()
+    return WindowsPrinterBackend()
+
+
+def render_label(data):
+    """Render the label for `data`; returns (image, preview image).
+
+    Runs on a pipeline worker thread: PIL images are fine off the Tk thread,
+    only the PhotoImage has to be made on it.
+    """
+    img = generate_qr_image(data)
+    return img, img.resize(PREVIEW_SIZE)
+
+
 def auto_detect_scanner():
     """Try to auto-detect a QR scanner from serial ports."""
     ports = serial.tools.list_ports.comports()
@@ -49,7 +72,7 @@ def auto_detect_scanner():
 
 
 class QRApp:
-    def __init__(self, root):
+    def __init__(self, root, print_backend=None):
         self.root = root
         self.root.title("QR Scanner & Printer")
         self.root.geometry("500x600")
@@ -77,8 +100,10 @@ class QRApp:
         self.image_label = tk.Label(root)
         self.image_label.pack(pady=10)
 
-        self.running = False
         self.scanner_port = None
+        self.pipeline = None
+        self.print_backend = print_backend
+        self.print_queue = None
 
     def start_scanning(self):
         """Start scanning after button click."""
@@ -87,56 +112,61 @@ class QRApp:
             messagebox.showerror("Error", "No QR scanner detected.")
             return
 
-        self.start_button.config(state="disabled", text="Scanning...")
-        self.running = True
-        self.thread = threading.Thread(target=self.listen_scanner, daemon=True)
-        self.thread.start()
-        self.update_status(f"Listening on {self.scanner_port}...")
+        # Labels are collected for a couple of seconds (or a full sheet) and
+        # printed as one job instead of one spooler job per scan. Set up the
+        # printer first so a missing one does not leave the port open.
+        if self.print_queue is None:
+            try:
+                backend = self.print_backend or default_print_backend()
+            except Exception as e:
+                messagebox.showerror("Error", f"No printer available: {e}")
+                return
+            self.print_queue = PrintQueue(backend, on_printed=self.on_labels_printed)
 
-    def listen_scanner(self):
         try:
-            ser = serial.Serial(self.scanner_port, 9600, timeout=1)
-            buffer = ""
-
-            while self.running:
-                if ser.in_waiting > 0:
-                    data = ser.read(ser.in_waiting).decode("utf-8", errors="ignore").strip()
-                    if data:
-                        buffer += data
-                        if "\n" in buffer or "\r" in buffer:
-                            qr_data = buffer.splitlines()[0].strip()
-                            if qr_data:
-                                self.process_qr(qr_data)
-                            buffer = ""
-                time.sleep(0.1)
+            source = SerialSource(self.scanner_port, 9600)
+        except serial.SerialException as e:
+            messagebox.showerror("Error", f"Cannot open {self.scanner_port}: {e}")
+            return
 
-            ser.close()
+        # Reading, rendering and printing run on their own threads; results
+        # come back through process_qr on the Tk thread
+        try:
+            self.pipeline = LabelPipeline(self.root, source, self.process_qr, render_label, self.queue_label)
+            self.pipeline.start()
         except Exception as e:
-            self.update_status(f"Scanner error: {e}")
-
-    def process_qr(self, qr_data):
-        """Generate, display, print QR code and show scanned text."""
-        # Show raw data in text field
-        self.scanned_text.set(qr_data)
-
-        self.update_status(f"Scanned: {qr_data}")
-
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-            filename = tmp_file.name
-
-        generate_qr_image(qr_data, filename)
-
-        # Show QR in GUI
-        img = Image.open(filename).resize((150, 150))
-        tk_img = ImageTk.PhotoImage(img)
-        self.image_label.configure(image=tk_img)
-        self.image_label.image = tk_img
-
-        # Print
-        result = print_image(filename)
-        self.update_status(result)
+            source.close()
+            messagebox.showerror("Error", f"Cannot start scanning: {e}")
+            return
+        self.start_button.config(state="disabled", text="Scanning...")
+        self.update_status(f"Listening on {self.scanner_port}...")
 
-        os.unlink(filename)
+    def queue_label(self, data, rendered):
+        """Hand a rendered label to the print queue; runs on the pipeline's print thread."""
+        img, _ = rendered
+        return self.print_queue.add(data, img)
+
+    def on_labels_printed(self, codes, status):
+        # Runs on the print queue thread; the pipeline carries it to the Tk thread
+        self.pipeline.report("printed", ", ".join(codes), status)
+
+    def process_qr(self, kind, qr_data, value):
+        """Show one pipeline event; always called on the Tk thread."""
+        if kind == "scanned":
+            self.scanned_text.set(qr_data)
+            self.update_status(f"Scanned: {qr_data}")
+        elif kind == "rendered":
+            _, preview = value
+            tk_img = ImageTk.PhotoImage(preview)
+            self.image_label.configure(image=tk_img)
+            self.image_label.image = tk_img
+        elif kind == "printed":
+            self.update_status(value)
+        elif kind == "failed":
+            self.update_status(f"Label error for {qr_data}: {value}")
+        elif kind == "stopped":
+            self.update_status(f"Scanner error: {value}")
+            self.start_button.config(state="normal", text="Start Scanning")
 
     def update_status(self, msg):
         self.textbox.config(state="normal")
@@ -145,12 +175,20 @@ class QRApp:
         self.textbox.config(state="disabled")
 
     def on_close(self):
-        self.running = False
+        if self.pipeline:
+            self.pipeline.stop(timeout=1)
+            self.pipeline.printer.join(timeout=5)
+        if self.print_queue:
+            self.print_queue.close(timeout=10)  # Print the last, partly filled sheet
         self.root.destroy()
 
 
 if __name__ == "__main__":
+    # --print-to DIR writes label sheets as PNG files instead of printing
+    backend = None
+    if "--print-to" in sys.argv:
+        backend = FileSinkBackend(sys.argv[sys.argv.index("--print-to") + 1])
     root = tk.Tk()
-    app = QRApp(root)
+    app = QRApp(root, backend)
     root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
@@ -325,12 +325,11 @@ def generate_qr_code_image(data: str, filename: str = "laser_printing_qr.png"):
     """Generate QR code image from data (requires qrcode library)"""
     try:
         import qrcode
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        img.save(filename)
+        from qr_render import QR_CACHE
+        # Repeated payloads reuse the cached PNG bytes: no QR or PNG encoding
+        png = QR_CACHE.png(data, version=1, error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=10, border=5)
+        with open(filename, "wb") as f:
+            f.write(png)
         print(f"QR code saved as: {filename}")
         return filename
     except ImportError:
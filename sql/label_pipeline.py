@@ -0,0 +1,106 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from scan_reader import ScanReader
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class LabelPipeline:
+    """Scanner -> render pool -> print thread, reported on the Tk thread.
+
+    Stage 1 is a ScanReader thread. Each code it frames is submitted to a
+    pool of `workers` render threads running `render(code)`. A single print
+    thread takes the finished renders in scan order and runs
+    `print_label(code, rendered)`, so labels come out in the order they were
+    scanned and a slow printer holds up neither scanning nor rendering.
+
+    Every stage reports to one event queue that is drained on the Tk thread
+    with after(); `on_event(kind, code, value)` is called there, and only
+    there. "rendered" comes from the render thread as soon as the label is
+    ready, so a preview never waits for the printer. `kind` is one of:
+      "scanned"  value None
+      "rendered" value is render()'s result
+      "printed"  value is print_label()'s result
+      "failed"   value is the exception from render or print
+      "stopped"  code None, value is the scanner exception
+    """
+
+    def __init__(self, root, source, on_event, render, print_label, workers=2, poll_ms=20):
+        self.root = root
+        self.on_event = on_event
+        self.render = render
+        self.print_label = print_label
+        self.poll_ms = poll_ms
+        self.events = queue.Queue()
+        self.pending = queue.Queue()  # (code, render future) in scan order
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="label-render")
+        # ScanReader only ever calls codes.put(), so the pipeline takes the queue's place
+        self.reader = ScanReader(source, codes=self)
+        self.printer = threading.Thread(target=self._print_loop, name="label-print", daemon=True)
+        self.stopped = False
+
+    def start(self):
+        self.printer.start()
+        self.reader.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def stop(self, timeout=None):
+        """Stop scanning; labels already scanned are still rendered, printed and reported."""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.reader.stop(timeout)
+        self.pending.put(_STOP)
+        self.pool.shutdown(wait=False)
+
+    def report(self, kind, code, value):
+        """Queue an event for on_event from any thread, e.g. a later print stage."""
+        self.events.put((kind, code, value))
+
+    # --- Reader thread ---
+    def put(self, code):
+        self.events.put(("scanned", code, None))
+        self.pending.put((code, self.pool.submit(self._render, code)))
+
+    # --- Render threads ---
+    def _render(self, code):
+        # Report the render as soon as it is done, not when the printer gets to it;
+        # posting before returning keeps "rendered" ahead of "printed"
+        rendered = self.render(code)
+        self.events.put(("rendered", code, rendered))
+        return rendered
+
+    # --- Print thread ---
+    def _print_loop(self):
+        while True:
+            entry = self.pending.get()
+            if entry is _STOP:
+                return
+            code, future = entry
+            try:
+                rendered = future.result()
+                self.events.put(("printed", code, self.print_label(code, rendered)))
+            except Exception as e:
+                logger.error(f"Label for {code!r} failed: {e}")
+                self.events.put(("failed", code, e))
+
+    # --- Tk thread ---
+    def _poll(self):
+        while True:
+            try:
+                kind, code, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.on_event(kind, code, value)
+
+        if self.reader.error and not self.stopped:
+            self.stop()
+            self.on_event("stopped", None, self.reader.error)
+        if self.stopped and not self.printer.is_alive() and self.events.empty():
+            return
+        self.root.after(self.poll_ms, self._poll)
@@ -0,0 +1,169 @@
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from PIL import Image, ImageDraw
+
+logger = logging.getLogger(__name__)
+
+# GetDeviceCaps indexes
+HORZRES = 8
+VERTRES = 10
+
+
+# --- Layout ---
+class SheetLayout:
+    """Lay labels out in a grid on one image; columns=1 gives a label roll strip.
+
+    Each label is scaled to `label_px` square and, with `captions`, has its
+    code printed underneath.
+    """
+
+    def __init__(self, columns=3, label_px=290, gap_px=30, margin_px=40, captions=True):
+        self.columns = columns
+        self.label_px = label_px
+        self.gap_px = gap_px
+        self.margin_px = margin_px
+        self.caption_px = 20 if captions else 0
+
+    def compose(self, labels):
+        """Return one white "L" image holding every (code, image) in `labels`."""
+        columns = min(self.columns, len(labels))
+        rows = math.ceil(len(labels) / columns)
+        cell_w = self.label_px + self.gap_px
+        cell_h = self.label_px + self.caption_px + self.gap_px
+        sheet = Image.new("L", (2 * self.margin_px + columns * cell_w - self.gap_px,
+                                2 * self.margin_px + rows * cell_h - self.gap_px), 255)
+        draw = ImageDraw.Draw(sheet)
+        for i, (code, image) in enumerate(labels):
+            x = self.margin_px + (i % columns) * cell_w
+            y = self.margin_px + (i // columns) * cell_h
+            label = image if image.size == (self.label_px, self.label_px) else \
+                image.resize((self.label_px, self.label_px), Image.NEAREST)
+            sheet.paste(label.convert("L"), (x, y))
+            if self.caption_px:
+                draw.text((x, y + self.label_px + 2), code, fill=0)
+        return sheet
+
+
+# --- Backends ---
+class FileSinkBackend:
+    """Writes each job as a PNG in `directory`; a stand-in printer for testing."""
+
+    def __init__(self, directory="printed_labels"):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.jobs = 0
+
+    def submit(self, image, title):
+        self.jobs += 1
+        path = os.path.join(self.directory, f"{datetime.now():%Y%m%d_%H%M%S}_{self.jobs:04d}.png")
+        image.save(path)
+        return f"{title}: wrote {path}"
+
+
+class WindowsPrinterBackend:
+    """Prints each job as one GDI document, scaled to fit the printable area."""
+
+    def __init__(self, printer_name=None):
+        import win32print
+        self.printer_name = printer_name or win32print.GetDefaultPrinter()
+
+    def submit(self, image, title):
+        import win32ui
+        from PIL import ImageWin
+        hdc = win32ui.CreateDC()
+        hdc.CreatePrinterDC(self.printer_name)
+        try:
+            scale = min(hdc.GetDeviceCaps(HORZRES) / image.width, hdc.GetDeviceCaps(VERTRES) / image.height)
+            hdc.StartDoc(title)
+            hdc.StartPage()
+            ImageWin.Dib(image.convert("RGB")).draw(hdc.GetHandleOutput(),
+                                                    (0, 0, int(image.width * scale), int(image.height * scale)))
+            hdc.EndPage()
+            hdc.EndDoc()
+        finally:
+            hdc.DeleteDC()
+        return f"{title}: printed to {self.printer_name}"
+
+
+# --- Queue ---
+class PrintQueue:
+    """Coalesce labels into one print job per sheet.
+
+    Labels added with add() are held until `max_labels` are waiting or
+    `window_s` has passed since the first of them, then laid out with
+    `layout` and sent to `backend.submit(image, title)` as a single job from
+    the queue's own thread. `on_printed(codes, status)` is called on that
+    thread after each job, with a "Print error: ..." status if it failed.
+    """
+
+    def __init__(self, backend, layout=None, max_labels=12, window_s=2.0, on_printed=None):
+        self.backend = backend
+        self.layout = layout or SheetLayout()
+        self.max_labels = max_labels
+        self.window_s = window_s
+        self.on_printed = on_printed
+        self.pending = []
+        self.first_at = None
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="print-queue", daemon=True)
+        self.thread.start()
+
+    def add(self, code, image):
+        """Queue one label; returns a short status for the log."""
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("Print queue is closed")
+            if not self.pending:
+                self.first_at = time.monotonic()
+            self.pending.append((code, image))
+            self.cond.notify()
+            return f"Queued {code} for printing ({len(self.pending)}/{self.max_labels} on this sheet)"
+
+    def flush(self):
+        """Print whatever is waiting now instead of at the end of the window."""
+        with self.cond:
+            self.first_at = 0
+            self.cond.notify()
+
+    def close(self, timeout=None):
+        """Print anything still waiting, then stop the queue thread."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.pending and (len(self.pending) >= self.max_labels or self.closed):
+                        break
+                    if self.closed:
+                        return
+                    if self.pending:
+                        remaining = self.first_at + self.window_s - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.cond.wait(remaining)
+                    else:
+                        self.cond.wait()
+                batch = self.pending[:self.max_labels]
+                del self.pending[:self.max_labels]
+                self.first_at = time.monotonic() if self.pending else None
+            self._print(batch)
+
+    def _print(self, batch):
+        codes = [code for code, _ in batch]
+        try:
+            status = self.backend.submit(self.layout.compose(batch), f"{len(batch)} QR label(s)")
+        except Exception as e:
+            logger.error(f"Print job for {len(batch)} label(s) failed: {e}")
+            status = f"Print error: {e}"
+        if self.on_printed:
+            self.on_printed(codes, status)
@@ -0,0 +1,85 @@
+import io
+import threading
+from collections import OrderedDict
+
+import qrcode
+
+
+def render_qr(data, version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4):
+    """Render `data` as a QR code and return a PIL image, without touching disk."""
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=error_correction,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+
+def png_buffer(image):
+    """Encode a PIL image as PNG into a BytesIO, rewound and ready to read."""
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer
+
+
+class QRCache:
+    """Bounded LRU cache of rendered QR codes.
+
+    Keyed by the payload plus every render parameter, so a reprint of the
+    same serial or MAC skips QR encoding entirely. Entries hold the PIL
+    image and, once asked for, its PNG bytes. Cached images are shared, so
+    callers must not modify them in place (resize/convert return copies).
+    Safe to use from several render threads.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # key -> [image, png bytes or None]
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, data, params):
+        key = (data, params.get("version", 1), params.get("error_correction", qrcode.constants.ERROR_CORRECT_L),
+               params.get("box_size", 10), params.get("border", 4))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # Render outside the lock; two threads missing on the same key both render
+        entry = [render_qr(data, **params), None]
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def image(self, data, **params):
+        """The PIL image for `data` rendered with render_qr(**params)."""
+        return self._entry(data, params)[0]
+
+    def png(self, data, **params):
+        """The PNG-encoded bytes for `data`, encoded once per cache entry."""
+        entry = self._entry(data, params)
+        if entry[1] is None:
+            entry[1] = png_buffer(entry[0]).getvalue()
+        return entry[1]
+
+    def stats(self):
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+QR_CACHE = QRCache()
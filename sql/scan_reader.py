@@ -0,0 +1,216 @@
+import logging
+import os
+import queue
+import selectors
+import threading
+
+logger = logging.getLogger(__name__)
+
+TERMINATORS = b"\r\n"
+
+
+class ByteRing:
+    """Fixed-capacity FIFO of bytes backed by one bytearray.
+
+    Writes wrap around the end of the array, so consuming a code never
+    shifts the bytes behind it.
+    """
+
+    def __init__(self, capacity=4096):
+        self.buf = bytearray(capacity)
+        self.capacity = capacity
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def write(self, data):
+        """Append `data`; returns how many bytes did not fit."""
+        n = min(len(data), self.capacity - self.length)
+        end = (self.start + self.length) % self.capacity
+        first = min(n, self.capacity - end)
+        self.buf[end:end + first] = data[:first]
+        self.buf[:n - first] = data[first:n]
+        self.length += n
+        return len(data) - n
+
+    def find_any(self, chars):
+        """Offset of the first byte that is in `chars`, or -1."""
+        for i in range(self.length):
+            if self.buf[(self.start + i) % self.capacity] in chars:
+                return i
+        return -1
+
+    def read(self, n):
+        """Remove and return the first `n` bytes."""
+        n = min(n, self.length)
+        end = self.start + n
+        if end <= self.capacity:
+            data = bytes(self.buf[self.start:end])
+        else:
+            data = bytes(self.buf[self.start:]) + bytes(self.buf[:end - self.capacity])
+        self.start = end % self.capacity
+        self.length -= n
+        return data
+
+    def clear(self):
+        self.start = self.length = 0
+
+
+class LineFramer:
+    """Split a byte stream into codes terminated by CR, LF or CR LF.
+
+    Blank lines (including the LF of a CR LF pair) are skipped. A code that
+    grows past the ring's capacity without a terminator is discarded up to
+    its next terminator rather than being delivered truncated.
+    """
+
+    def __init__(self, capacity=4096, encoding="utf-8"):
+        self.ring = ByteRing(capacity)
+        self.encoding = encoding
+        self.discarding = False
+
+    def feed(self, data):
+        """Add received bytes; returns the list of complete codes, in order."""
+        codes = []
+        while data:
+            overflow = self.ring.write(data)
+            data = data[len(data) - overflow:]
+            while True:
+                i = self.ring.find_any(TERMINATORS)
+                if i < 0:
+                    break
+                line = self.ring.read(i + 1)[:-1]
+                if self.discarding:
+                    self.discarding = False
+                    continue
+                code = line.decode(self.encoding, errors="replace").strip()
+                if code:
+                    codes.append(code)
+            if len(self.ring) == self.ring.capacity:
+                logger.warning(f"Scan longer than {self.ring.capacity} bytes without a line end; discarded")
+                self.ring.clear()
+                self.discarding = True
+        return codes
+
+
+# --- Byte sources ---
+class FdSource:
+    """Read from a POSIX file descriptor (tty or pty) through a selector."""
+
+    def __init__(self, fd, chunk=4096):
+        self.fd = fd
+        self.chunk = chunk
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(fd, selectors.EVENT_READ)
+
+    def read(self, timeout):
+        """Bytes available now, waiting up to `timeout` s; b"" if none arrived."""
+        if not self.selector.select(timeout):
+            return b""
+        try:
+            data = os.read(self.fd, self.chunk)
+        except OSError:
+            data = b""  # EIO: the other end of a pty was closed
+        if not data:
+            raise EOFError("Scanner disconnected")
+        return data
+
+    def close(self):
+        self.selector.close()
+        os.close(self.fd)
+
+
+class SerialSource:
+    """Read from a pyserial port; read(1) blocks until the first byte arrives."""
+
+    def __init__(self, port, baudrate=9600):
+        import serial
+        self.serial = serial.Serial(port, baudrate, timeout=None)
+
+    def read(self, timeout):
+        self.serial.timeout = timeout
+        data = self.serial.read(1)
+        if data and self.serial.in_waiting:
+            data += self.serial.read(self.serial.in_waiting)
+        return data
+
+    def close(self):
+        self.serial.close()
+
+
+class ScanReader:
+    """Background thread turning scanner bytes into codes on a queue.
+
+    The thread sleeps in a blocking read until data arrives, so a scan is
+    delivered as soon as its line end is received and an idle scanner costs
+    nothing. Every complete code goes onto `codes` (a queue.Queue) in scan
+    order; if the source fails, the exception is stored in `error` and
+    `on_error(exception)` is called on the reader thread.
+    """
+
+    def __init__(self, source, codes=None, on_error=None, capacity=4096, stop_check_s=0.5):
+        self.source = source
+        self.codes = codes if codes is not None else queue.Queue()
+        self.on_error = on_error
+        self.framer = LineFramer(capacity)
+        self.stop_check_s = stop_check_s
+        self.error = None
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="scan-reader", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """Stop reading (within `stop_check_s`) and close the source."""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout)
+
+    def _run(self):
+        try:
+            while self.running:
+                data = self.source.read(self.stop_check_s)
+                for code in self.framer.feed(data):
+                    self.codes.put(code)
+        except Exception as e:
+            logger.error(f"Scanner error: {e}")
+            self.error = e
+            if self.on_error:
+                self.on_error(e)
+        finally:
+            self.source.close()
+
+
+# --- Fake scanner ---
+def open_fake_scanner():
+    """Open a pty pair standing in for a serial scanner (POSIX only).
+
+    Returns (scanner_fd, reader_fd): write codes such as b"ABC123\\r\\n" to
+    scanner_fd and read them through FdSource(reader_fd), or open
+    os.ttyname(reader_fd) with pyserial.
+    """
+    import pty
+    import tty
+    scanner_fd, reader_fd = pty.openpty()
+    tty.setraw(reader_fd)  # No echo or line editing, like a real serial port
+    return scanner_fd, reader_fd
+
+
+if __name__ == "__main__":
+    # Self-check against a fake scanner: back-to-back scans in one write,
+    # a scan split across writes, and mixed line endings
+    scanner_fd, reader_fd = open_fake_scanner()
+    reader = ScanReader(FdSource(reader_fd))
+    reader.start()
+    os.write(scanner_fd, b"SN-0001\r\nSN-0002\r\nAA:BB:")
+    os.write(scanner_fd, b"CC:DD:EE:FF\nSN-0003\r")
+    expected = ["SN-0001", "SN-0002", "AA:BB:CC:DD:EE:FF", "SN-0003"]
+    received = [reader.codes.get(timeout=2) for _ in expected]
+    reader.stop()
+    os.close(scanner_fd)
+    print("OK" if received == expected else f"FAILED: {received}")
@@ -1,57 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from datetime import datetime
-
-# --- Menu Items ---
-menu = {
-    "Bruschetta": 6.50, "Mozzarella Sticks": 7.25, "Chicken Wings": 9.50, "Spring Rolls": 5.75,
-    "Garlic Bread": 4.50, "Stuffed Mushrooms": 8.00, "Calamari Fritti": 9.25, "Nachos Supreme": 8.75,
-    "Spinach Artichoke Dip": 7.50, "Shrimp Cocktail": 10.00, "Potato Skins": 6.75, "Hummus Platter": 6.25,
-    "Fried Pickles": 5.50, "Cheese Platter": 12.00, "Onion Rings": 4.75, "Caesar Salad": 6.75,
-    "Greek Salad": 7.00, "Cobb Salad": 8.50, "Caprese Salad": 7.25, "House Salad": 5.50,
-    "Waldorf Salad": 7.75, "Spinach Salad": 6.50, "Kale Quinoa Salad": 8.00, "Arugula Pear Salad": 7.50,
-    "Chef's Salad": 9.00, "Classic Cheeseburger": 8.99, "Bacon BBQ Burger": 10.50, "Veggie Burger": 8.25,
-    "Grilled Chicken Sandwich": 9.00, "Philly Cheesesteak": 10.25, "BLT Sandwich": 7.50,
-    "Turkey Club": 8.75, "Pulled Pork Sandwich": 9.25, "Fish Tacos": 10.00, "Portobello Mushroom Burger": 8.50,
-    "Margherita Pizza": 12.50, "Pepperoni Pizza": 13.75, "Supreme Pizza": 15.00, "Veggie Pizza": 13.25,
-    "Hawaiian Pizza": 14.00, "Buffalo Chicken Pizza": 14.50, "White Pizza": 13.00, "Spaghetti Carbonara": 14.25,
-    "Fettuccine Alfredo": 13.50, "Penne Arrabbiata": 12.75, "Lasagna": 15.50, "Pesto Pasta": 13.25,
-    "Seafood Linguine": 16.75, "Ravioli with Marinara": 14.00, "Grilled Salmon": 18.50,
-    "Chicken Parmesan": 15.75, "Beef Stir-Fry": 14.50, "Roasted Lamb Chops": 22.00, "Pork Tenderloin": 16.25,
-    "Vegetable Curry": 13.00, "Steak Ribeye": 24.00, "BBQ Ribs": 19.50, "Tofu Stir-Fry": 12.75,
-    "Shrimp Scampi": 17.50, "French Fries": 3.50, "Sweet Potato Fries": 4.25, "Mashed Potatoes": 3.75,
-    "Coleslaw": 2.75, "Steamed Broccoli": 3.25, "Garlic Mashed Cauliflower": 4.00, "Mac and Cheese": 4.50,
-    "Sauteed Spinach": 3.50, "Roasted Veggies": 4.00, "Chocolate Lava Cake": 6.50, "New York Cheesecake": 6.00,
-    "Tiramisu": 6.75, "Apple Pie": 5.50, "Creme Brulee": 6.25, "Ice Cream Sundae": 4.50, "Brownie": 4.00,
-    "Key Lime Pie": 5.75, "Soda": 2.50, "Iced Tea": 2.75, "Lemonade": 3.00, "Coffee": 2.25,
-    "Espresso": 3.50, "Bottled Water": 2.00, "Orange Juice": 3.25, "Milkshake": 4.75, "Smoothie": 5.00
-}
-
-# --- Categories ---
-categories = {
-    "Appetizers": ["Bruschetta", "Mozzarella Sticks", "Chicken Wings", "Spring Rolls", "Garlic Bread",
-                   "Stuffed Mushrooms", "Calamari Fritti", "Nachos Supreme", "Spinach Artichoke Dip",
-                   "Shrimp Cocktail", "Potato Skins", "Hummus Platter", "Fried Pickles", "Cheese Platter",
-                   "Onion Rings"],
-    "Salads": ["Caesar Salad", "Greek Salad", "Cobb Salad", "Caprese Salad", "House Salad",
-               "Waldorf Salad", "Spinach Salad", "Kale Quinoa Salad", "Arugula Pear Salad", "Chef's Salad"],
-    "Burgers and Sandwiches": ["Classic Cheeseburger", "Bacon BBQ Burger", "Veggie Burger",
-                               "Grilled Chicken Sandwich", "Philly Cheesesteak", "BLT Sandwich",
-                               "Turkey Club", "Pulled Pork Sandwich", "Fish Tacos", "Portobello Mushroom Burger"],
-    "Pizzas": ["Margherita Pizza", "Pepperoni Pizza", "Supreme Pizza", "Veggie Pizza",
-               "Hawaiian Pizza", "Buffalo Chicken Pizza", "White Pizza"],
-    "Pastas": ["Spaghetti Carbonara", "Fettuccine Alfredo", "Penne Arrabbiata", "Lasagna",
-               "Pesto Pasta", "Seafood Linguine", "Ravioli with Marinara"],
-    "Entrees": ["Grilled Salmon", "Chicken Parmesan", "Beef Stir-Fry", "Roasted Lamb Chops",
-                "Pork Tenderloin", "Vegetable Curry", "Steak Ribeye", "BBQ Ribs",
-                "Tofu Stir-Fry", "Shrimp Scampi"],
-    "Sides": ["French Fries", "Sweet Potato Fries", "Mashed Potatoes", "Coleslaw", "Steamed Broccoli",
-              "Garlic Mashed Cauliflower", "Mac and Cheese", "Sauteed Spinach", "Roasted Veggies"],
-    "Desserts": ["Chocolate Lava Cake", "New York Cheesecake", "Tiramisu", "Apple Pie",
-                 "Creme Brulee", "Ice Cream Sundae", "Brownie", "Key Lime Pie"],
-    "Beverages": ["Soda", "Iced Tea", "Lemonade", "Coffee", "Espresso", "Bottled Water",
-                  "Orange Juice", "Milkshake", "Smoothie"]
-}
+import os
+import sys
+
+# Shared widgets live next to NewApp.py in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from catalog import load_catalog
+from menu_search import DebouncedSearch, MenuSearchIndex
+from menu_view import VirtualMenuList, build_rows
+from order import Order, format_cents, to_cents
+from order_panel import OrderPanel
+from plu import PLUIndex
+from toast import Toaster
+
+# --- Menu Items & Categories ---
+# Loaded from the shared catalog (menu.json next to NewApp.py, or $CAFE_MENU)
+# so price changes need no code edit
+menu, categories = load_catalog()
 
 # --- Main Application Class ---
 class CafeApp:
@@ -60,9 +26,14 @@ class CafeApp:
         self.root.title("Café Menu & Billing")
         self.root.geometry("1000x700")
         self.root.resizable(True, True)  # Allow window resizing
-        self.order = {}
+        self.order = Order({item: to_cents(price) for item, price in menu.items()})
+        self.order.listeners.append(self.on_order_change)
         self.dark_mode = tk.BooleanVar(value=False)  # Initialize dark mode to False
         self.search_var = tk.StringVar()
+        self.search_index = MenuSearchIndex(menu)
+        self.plu_index = PLUIndex(categories)
+        self.code_var = tk.StringVar()
+        self.search_debouncer = DebouncedSearch(root, self.search_item)
         self.search_var.trace("w", self.dynamic_search)  # Dynamic search on text change
 
         # Café Logo/Title
@@ -76,10 +47,18 @@ class CafeApp:
         ttk.Label(top_frame, text="Search:").pack(side=tk.LEFT)
         self.search_entry = ttk.Entry(top_frame, textvariable=self.search_var, width=30)
         self.search_entry.pack(side=tk.LEFT, padx=5)
-        self.search_entry.bind("<Return>", lambda event: self.search_item())  # Enter key triggers search
-        ttk.Button(top_frame, text="Search", command=self.search_item).pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<Return>", lambda event: self.search_debouncer.flush())  # Enter key triggers search
+        ttk.Button(top_frame, text="Search", command=self.search_debouncer.flush).pack(side=tk.LEFT, padx=5)
         ttk.Checkbutton(top_frame, text="Dark Mode", variable=self.dark_mode, command=self.toggle_dark_mode).pack(side=tk.RIGHT)
 
+        # Rapid entry: type item codes such as "3*PZ2 BV4" and press Enter
+        ttk.Label(top_frame, text="Code:").pack(side=tk.LEFT, padx=(15, 0))
+        self.code_entry = ttk.Entry(top_frame, textvariable=self.code_var, width=20)
+        self.code_entry.pack(side=tk.LEFT, padx=5)
+        self.code_entry.bind("<Return>", lambda event: self.enter_codes())
+        self.root.bind("<F2>", lambda event: self.code_entry.focus_set())
+        self.code_entry.focus_set()
+
         # Main content frame with two columns
         self.content_frame = ttk.Frame(root)
         self.content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -90,11 +69,12 @@ class CafeApp:
 
         self.canvas = tk.Canvas(self.menu_frame)
         self.scrollbar = ttk.Scrollbar(self.menu_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = ttk.Frame(self.canvas)
 
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        # Only the rows in view get widgets; they are reused while scrolling
+        self.menu_list = VirtualMenuList(self.canvas, self.scrollbar,
+                                         item_text=lambda item: f"{self.plu_index.code_of[item]:<5}{item:<30}: ${menu[item]:.2f}",
+                                         on_click=self.add_item_from_menu_click,
+                                         button_cursor="hand2")
 
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.scrollbar.pack(side=tk.RIGHT, fill="y")
@@ -111,11 +91,18 @@ class CafeApp:
         ttk.Label(self.order_display_frame, text="Current Order", style="Category.TLabel").pack(pady=5)
         self.current_order_text = scrolledtext.ScrolledText(self.order_display_frame, height=15, width=40, state='disabled', font=("Courier", 10))
         self.current_order_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.order_panel = OrderPanel(
+            self.current_order_text,
+            header_lines=[f"{'Item':<25}{'Qty':<5}{'Price':<8}{'Total'}", "-" * 50],
+            format_line=lambda item, qty, line_total: f"{item:<25}{qty:<5}${menu[item]:<8.2f}${format_cents(line_total)}",
+            format_subtotal=lambda subtotal: f"{'Subtotal':<38}${format_cents(subtotal)}")
 
         # Order Control Buttons
         order_buttons_frame = ttk.Frame(self.order_display_frame)
         order_buttons_frame.pack(fill=tk.X, pady=5)
         ttk.Button(order_buttons_frame, text="Clear Order", command=self.clear_order).pack(side=tk.LEFT, expand=True, padx=5)
+        ttk.Button(order_buttons_frame, text="Undo", command=self.undo_order_change).pack(side=tk.LEFT, expand=True, padx=5)
+        self.root.bind("<Control-z>", lambda event: self.undo_order_change())
         ttk.Button(order_buttons_frame, text="Generate Invoice", command=self.generate_invoice).pack(side=tk.LEFT, expand=True, padx=5)
 
         # Quantity input
@@ -129,6 +116,9 @@ class CafeApp:
 
         self.update_order_display()
 
+        # Non-modal notifications so item adds never block the till
+        self.toaster = Toaster(root)
+
         # Apply theme after all widgets are created
         self.set_theme()
 
@@ -190,53 +180,20 @@ class CafeApp:
         qty = self.qty_var.get()
         if qty and not qty.isdigit():
             self.qty_var.set("1")  # Reset to default if invalid
-            messagebox.showwarning("Warning", "Quantity must be a positive number.")
+            self.toaster.show("Quantity must be a positive number.", "warning")
 
     def display_menu(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        for category, items in categories.items():
-            ttk.Label(self.scrollable_frame, text=category, style="Category.TLabel").pack(anchor="w", pady=5)
-            for item in items:
-                item_button = ttk.Button(self.scrollable_frame,
-                                         text=f"{item:<30}: ${menu[item]:.2f}",
-                                         command=lambda i=item: self.add_item_from_menu_click(i),
-                                         style="MenuItem.TButton")
-                item_button.pack(anchor="w", padx=10, fill=tk.X, pady=2)
-                item_button.bind("<Enter>", lambda e, b=item_button: b.config(cursor="hand2"))  # Hand cursor on hover
+        self.menu_list.set_rows(build_rows(categories))
 
     def dynamic_search(self, *args):
-        self.search_item()  # Update menu as user types
+        self.search_debouncer.schedule()  # Update menu once typing pauses
 
     def search_item(self):
         keyword = self.search_var.get().lower()
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
         if keyword:
-            found_items = {cat: [] for cat in categories}
-            for cat, items in categories.items():
-                for item in items:
-                    if keyword in item.lower():
-                        found_items[cat].append(item)
-            
-            displayed_any = False
-            for category, items_in_cat in found_items.items():
-                if items_in_cat:
-                    ttk.Label(self.scrollable_frame, text=category, style="Category.TLabel").pack(anchor="w", pady=5)
-                    for item in items_in_cat:
-                        item_button = ttk.Button(self.scrollable_frame,
-                                                 text=f"{item:<30}: ${menu[item]:.2f}",
-                                                 command=lambda i=item: self.add_item_from_menu_click(i),
-                                                 style="MenuItem.TButton")
-                        item_button.pack(anchor="w", padx=10, fill=tk.X, pady=2)
-                        item_button.bind("<Enter>", lambda e, b=item_button: b.config(cursor="hand2"))
-                    displayed_any = True
-            if not displayed_any:
-                ttk.Label(self.scrollable_frame, text="No items found matching your search.", foreground="red").pack(pady=10)
+            self.menu_list.apply_filter(self.search_index.search_names(keyword))
         else:
-            self.display_menu()
+            self.menu_list.apply_filter(None)
 
     def add_item_from_menu_click(self, item_name):
         try:
@@ -244,36 +201,44 @@ class CafeApp:
             if quantity_to_add <= 0:
                 raise ValueError("Quantity must be a positive number.")
         except ValueError as e:
-            messagebox.showerror("Error", str(e) if str(e) != "" else "Invalid quantity. Please enter a positive number.")
+            self.toaster.show(str(e) if str(e) != "" else "Invalid quantity. Please enter a positive number.", "error")
             return
 
-        self.order[item_name] = self.order.get(item_name, 0) + quantity_to_add
-        self.update_order_display()
-        messagebox.showinfo("Item Added", f"Added {quantity_to_add} x {item_name} to order.")
+        self.order.add(item_name, quantity_to_add)
+        self.toaster.item_added(item_name, quantity_to_add)
 
-    def update_order_display(self):
-        self.current_order_text.config(state='normal')
-        self.current_order_text.delete(1.0, tk.END)
-        if not self.order:
-            self.current_order_text.insert(tk.END, "Your order is empty.")
+    def enter_codes(self):
+        try:
+            lines = self.plu_index.parse(self.code_var.get())
+        except ValueError as e:
+            self.toaster.show(str(e), "error")
+            return
+        for item_name, qty in lines:
+            self.order.add(item_name, qty)
+            self.toaster.item_added(item_name, qty)
+        self.code_var.set("")
+
+    def on_order_change(self, item):
+        if item is None:
+            self.update_order_display()
         else:
-            order_summary = f"{'Item':<25}{'Qty':<5}{'Price':<8}{'Total'}\n"
-            order_summary += "-" * 50 + "\n"
-            for item, qty in self.order.items():
-                order_summary += f"{item:<25}{qty:<5}${menu[item]:<8.2f}${menu[item] * qty:.2f}\n"
-            order_summary += "-" * 50
-            self.current_order_text.insert(tk.END, order_summary)
-        self.current_order_text.config(state='disabled')
+            self.order_panel.set_line(item, self.order.quantities.get(item, 0), self.order.line_total(item))
+
+    def update_order_display(self):
+        self.order_panel.reset((item, qty, self.order.line_total(item)) for item, qty in self.order.items())
+
+    def undo_order_change(self):
+        self.order.undo()
 
     def clear_order(self):
-        if messagebox.askyesno("Confirm", "Clear entire order?"):
+        if self.order:
+            # No confirmation dialog: clearing is undoable
             self.order.clear()
-            self.update_order_display()
-            messagebox.showinfo("Cleared", "Order cleared.")
+            self.toaster.show("Order cleared. Press Ctrl+Z to undo.")
 
     def generate_invoice(self):
         if not self.order:
-            messagebox.showwarning("Warning", "Order is empty.")
+            self.toaster.show("Order is empty.", "warning")
             return
 
         invoice_win = tk.Toplevel(self.root)
@@ -297,9 +262,7 @@ class CafeApp:
         ttk.Button(invoice_win, text="Save Invoice", command=lambda: self.save_invoice(invoice_text)).pack(pady=5)
 
     def generate_invoice_text(self):
-        subtotal = sum(menu[item] * qty for item, qty in self.order.items())
-        tax = subtotal * 0.08
-        total = subtotal + tax
+        order = self.order
         lines = [
             f"=== Café Invoice ===",
             f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
@@ -307,13 +270,13 @@ class CafeApp:
             f"{'Item':<25}{'Qty':<5}{'Price':<8}{'Total'}",
             "-" * 50
         ]
-        for item, qty in self.order.items():
-            lines.append(f"{item:<25}{qty:<5}${menu[item]:<8.2f}${menu[item] * qty:.2f}")
+        for item, qty in order.items():
+            lines.append(f"{item:<25}{qty:<5}${format_cents(order.unit_price(item)):<8}${format_cents(order.line_total(item))}")
         lines += [
             "-" * 50,
-            f"{'Subtotal':<40}${subtotal:.2f}",
-            f"{'Tax (8%)':<40}${tax:.2f}",
-            f"{'Total':<40}${total:.2f}",
+            f"{'Subtotal':<40}${format_cents(order.subtotal_cents)}",
+            f"{'Tax (8%)':<40}${format_cents(order.tax_cents)}",
+            f"{'Total':<40}${format_cents(order.total_cents)}",
             "----------------------------------------------",
             "Thank you for dining with us!"
         ]
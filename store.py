@@ -0,0 +1,163 @@
+import logging
+import queue
+import sqlite3
+import threading
+
+from order import compute_tax
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS order_lines (
+    order_id INTEGER NOT NULL REFERENCES orders(id),
+    item TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    unit_cents INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS invoices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders(id),
+    journal_seq INTEGER,
+    invoice_key TEXT,
+    created_at TEXT NOT NULL,
+    subtotal_cents INTEGER NOT NULL,
+    tax_cents INTEGER NOT NULL,
+    total_cents INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
+CREATE INDEX IF NOT EXISTS idx_order_lines_order ON order_lines(order_id);
+CREATE INDEX IF NOT EXISTS idx_order_lines_item ON order_lines(item);
+CREATE INDEX IF NOT EXISTS idx_invoices_created_at ON invoices(created_at);
+CREATE INDEX IF NOT EXISTS idx_invoices_journal_seq ON invoices(journal_seq);
+"""
+
+# Databases created before invoices had keys get the column on open
+MIGRATIONS = {"invoice_key": "ALTER TABLE invoices ADD COLUMN invoice_key TEXT"}
+KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_invoices_key ON invoices(invoice_key)"
+
+# Fixed SQL text so sqlite3's statement cache reuses the prepared statements
+INSERT_ORDER = "INSERT INTO orders (created_at) VALUES (?)"
+INSERT_LINE = "INSERT INTO order_lines (order_id, item, qty, unit_cents) VALUES (?, ?, ?, ?)"
+INSERT_INVOICE = ("INSERT INTO invoices (order_id, journal_seq, invoice_key, created_at, subtotal_cents, tax_cents, "
+                  "total_cents) VALUES (?, ?, ?, ?, ?, ?, ?)")
+FIND_KEY = "SELECT 1 FROM invoices WHERE invoice_key = ?"
+
+_STOP = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class OrderStore:
+    """SQLite store for orders, order lines and invoices.
+
+    All writes go through one long-lived connection owned by a background
+    writer thread, which drains its queue and commits each batch in a single
+    transaction, so saving never blocks the Tk loop. History queries use a
+    separate read connection; WAL mode lets them run alongside the writer.
+    A record whose "key" is already stored is skipped, so saving the same
+    invoice twice leaves one row.
+    """
+
+    def __init__(self, path="cafe.db"):
+        self.path = path
+        conn = _connect(path)
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(invoices)")}
+        for column, sql in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(sql)
+        conn.execute(KEY_INDEX)
+        conn.commit()
+        conn.close()
+        self.reader = _connect(path)
+        self.read_lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="order-store-writer", daemon=True)
+        self.writer.start()
+
+    # --- Writing ---
+    def save_invoice(self, record, journal_seq=None, on_done=None):
+        """Queue a journal-format invoice record for insertion.
+
+        `on_done(error)` is called on the writer thread once the batch holding
+        the record has been committed (error is None) or rolled back.
+        """
+        self.jobs.put((record, journal_seq, on_done))
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        self.jobs.join()
+
+    def close(self):
+        self.jobs.put(_STOP)
+        self.writer.join()
+        self.reader.close()
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self.jobs.get()]
+            while True:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+            jobs = [job for job in batch if job is not _STOP]
+            error = None
+            try:
+                with conn:
+                    for record, journal_seq, _ in jobs:
+                        self._insert(conn, record, journal_seq)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to store {len(jobs)} invoice(s): {e}")
+                error = e
+            for _, _, on_done in jobs:
+                if on_done:
+                    on_done(error)
+            for _ in batch:
+                self.jobs.task_done()
+        conn.close()
+
+    @staticmethod
+    def _insert(conn, record, journal_seq):
+        key = record.get("key")
+        if key and conn.execute(FIND_KEY, (key,)).fetchone():
+            return  # Already stored by an earlier save of the same invoice
+        created_at = record["ts"]
+        order_id = conn.execute(INSERT_ORDER, (created_at,)).lastrowid
+        conn.executemany(INSERT_LINE, [(order_id, item, qty, unit) for item, qty, unit in record["lines"]])
+        subtotal = sum(qty * unit for _, qty, unit in record["lines"])
+        tax = compute_tax(subtotal, record["tax_bp"])
+        conn.execute(INSERT_INVOICE, (order_id, journal_seq, key, created_at, subtotal, tax, subtotal + tax))
+
+    # --- History queries ---
+    def _query(self, sql, params=()):
+        with self.read_lock:
+            return self.reader.execute(sql, params).fetchall()
+
+    def invoices_between(self, start, end):
+        """Invoices with start <= created_at < end, as (id, journal_seq, created_at, total_cents)."""
+        return self._query("SELECT id, journal_seq, created_at, total_cents FROM invoices "
+                           "WHERE created_at >= ? AND created_at < ? ORDER BY created_at", (start, end))
+
+    def recent_invoices(self, limit=50):
+        return self._query("SELECT id, journal_seq, created_at, total_cents FROM invoices "
+                           "ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def item_sales(self, item, start="", end="9999"):
+        """Total (qty, revenue_cents) sold of `item` between two timestamps."""
+        return self._query("SELECT COALESCE(SUM(l.qty), 0), COALESCE(SUM(l.qty * l.unit_cents), 0) "
+                           "FROM order_lines l JOIN orders o ON o.id = l.order_id "
+                           "WHERE l.item = ? AND o.created_at >= ? AND o.created_at < ?", (item, start, end))[0]
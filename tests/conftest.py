@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules are plain scripts, not a package: put the app and the QR tools on the path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "sql")]
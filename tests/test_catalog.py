@@ -0,0 +1,131 @@
+import json
+import marshal
+import os
+
+import pytest
+
+import catalog as catalog_module
+from catalog import CACHE_SUFFIX, CatalogWatcher, load_catalog, load_compact_catalog, parse_catalog
+
+MENU = {"categories": {"Coffee": {"Latte": 3.5, "Espresso": 2.75}, "Bakery": {"Brownie": 4.25}}}
+
+
+class FakeRoot:
+    """Records after() callbacks instead of running a Tk loop."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+        return len(self.pending)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def run_next(self):
+        self.pending.pop(0)()
+
+
+def test_parse_json():
+    menu, categories = parse_catalog(json.dumps(MENU).encode(), "menu.json")
+    assert menu == {"Latte": 3.5, "Espresso": 2.75, "Brownie": 4.25}
+    assert categories == {"Coffee": ["Latte", "Espresso"], "Bakery": ["Brownie"]}
+
+
+def test_parse_csv():
+    data = "category,item,price\nCoffee,Latte,3.50\nBakery, Brownie ,4.25\n".encode()
+    assert parse_catalog(data, "menu.csv") == ({"Latte": 3.5, "Brownie": 4.25},
+                                               {"Coffee": ["Latte"], "Bakery": ["Brownie"]})
+
+
+@pytest.mark.parametrize("catalog", [
+    [],
+    {"menu": {}},
+    {"categories": ["Coffee"]},
+    {"categories": {"Coffee": ["Latte"]}},
+    {"categories": {"Coffee": {"Latte": None}}},
+    {"categories": {"Coffee": {"Latte": True}}},
+    {"categories": {"Coffee": {"Latte": "free"}}},
+])
+def test_bad_json_shape_is_value_error(catalog):
+    with pytest.raises(ValueError):
+        parse_catalog(json.dumps(catalog).encode(), "menu.json")
+
+
+@pytest.mark.parametrize("data", [b"category,item\nCoffee,Latte\n", b"category,item,price\nCoffee,Latte\n",
+                                  b"category,item,price\nCoffee,Latte,abc\n"])
+def test_bad_csv_row_is_value_error(data):
+    with pytest.raises(ValueError):
+        parse_catalog(data, "menu.csv")
+
+
+def test_watcher_keeps_polling_after_bad_edit(tmp_path):
+    path = tmp_path / "menu.json"
+    path.write_text(json.dumps(MENU))
+    changes = []
+    root = FakeRoot()
+    watcher = CatalogWatcher(root, lambda old, new: changes.append(new), str(path))
+
+    path.write_text(json.dumps({"categories": {"Coffee": ["Latte"]}}))
+    os.utime(path, ns=(1, 1))
+    root.run_next()
+    assert not changes and len(root.pending) == 1
+
+    path.write_text(json.dumps({"categories": {"Coffee": {"Latte": 3.75}}}))
+    root.run_next()
+    assert [snapshot.menu["Latte"] for snapshot in changes] == [3.75]
+    assert watcher.snapshot.version == 2
+
+
+@pytest.fixture
+def menu_path(tmp_path):
+    path = tmp_path / "menu.json"
+    path.write_text(json.dumps(MENU))
+    return str(path)
+
+
+def test_load_round_trip(menu_path):
+    expected = parse_catalog(json.dumps(MENU).encode(), "menu.json")
+    assert load_catalog(menu_path) == expected  # Builds the cache
+    assert load_catalog(menu_path) == expected  # Reads it back
+    compact = load_compact_catalog(menu_path)
+    assert dict(compact.menu) == expected[0]
+    assert {category: list(items) for category, items in compact.categories.items()} == expected[1]
+    assert compact.cents["Espresso"] == 275
+
+
+def test_fresh_cache_skips_parsing(menu_path, monkeypatch):
+    load_catalog(menu_path)
+    monkeypatch.setattr(catalog_module, "parse_catalog", None)
+    assert load_catalog(menu_path)[0]["Latte"] == 3.5
+
+
+def _rewrite_cache(menu_path, edit):
+    with open(menu_path + CACHE_SUFFIX, "rb") as f:
+        cached = marshal.loads(f.read())
+    edit(cached)
+    with open(menu_path + CACHE_SUFFIX, "wb") as f:
+        marshal.dump(cached, f)
+
+
+def test_old_cache_version_is_rebuilt(menu_path):
+    load_catalog(menu_path)
+    # Same mtime and size as the catalog, but an older layout with stale prices
+    _rewrite_cache(menu_path, lambda cached: cached.update(version=1, cents=[0] * len(cached["cents"])))
+    assert load_catalog(menu_path)[0]["Latte"] == 3.5
+    with open(menu_path + CACHE_SUFFIX, "rb") as f:
+        assert marshal.loads(f.read())["version"] == catalog_module.CACHE_VERSION
+
+
+def test_cache_missing_keys_is_a_miss(menu_path):
+    load_catalog(menu_path)
+    _rewrite_cache(menu_path, lambda cached: cached.pop("by_name"))
+    assert load_compact_catalog(menu_path).id_of("Brownie") == 2
+
+
+def test_corrupt_cache_is_a_miss(menu_path):
+    load_catalog(menu_path)
+    with open(menu_path + CACHE_SUFFIX, "wb") as f:
+        f.write(b"not marshal")
+    assert load_catalog(menu_path)[0]["Brownie"] == 4.25
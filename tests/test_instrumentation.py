@@ -0,0 +1,31 @@
+import pytest
+
+from instrumentation import TRACER, _TracedCallWrapper, traced
+
+
+class Panel:
+    @traced
+    def refresh(self):
+        pass
+
+    def clear(self):
+        pass
+
+
+@pytest.fixture
+def tracer():
+    TRACER.clear()
+    TRACER.enabled = True
+    yield TRACER
+    TRACER.enabled = False
+    TRACER.clear()
+
+
+def test_traced_tk_command_is_recorded_once(tracer):
+    _TracedCallWrapper(Panel().refresh, None, None)()
+    assert [event[0] for event in tracer.events] == ["Panel.refresh"]
+
+
+def test_plain_tk_command_is_recorded(tracer):
+    _TracedCallWrapper(Panel().clear, None, None)()
+    assert [event[0] for event in tracer.events] == ["Panel.clear"]
@@ -0,0 +1,148 @@
+import glob
+import os
+
+import pytest
+
+import journal as journal_module
+from journal import InvoiceJournal, render_record
+
+
+def record(n, key=None):
+    rec = {"ts": "2024-01-01 10:00:00", "tax_bp": 800, "lines": [["Latte", n, 350]]}
+    if key:
+        rec["key"] = key
+    return rec
+
+
+def segments(directory):
+    return sorted(glob.glob(os.path.join(directory, "journal-*.jsonl")))
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "journal")
+
+
+def test_append_get_and_records(directory):
+    journal = InvoiceJournal(directory)
+    assert [journal.append(record(n)) for n in (1, 2, 3)] == [1, 2, 3]
+    assert journal.get(2)["lines"] == [["Latte", 2, 350]]
+    assert [r["seq"] for r in journal.records(2)] == [2, 3]
+    assert "Latte" in journal.render_text(3)
+    with pytest.raises(KeyError):
+        journal.get(4)
+    journal.close()
+
+
+def test_rotation_and_reopen(directory):
+    journal = InvoiceJournal(directory, max_segment_bytes=200)
+    for n in range(1, 11):
+        journal.append(record(n))
+    journal.close()
+    assert len(segments(directory)) > 1
+
+    journal = InvoiceJournal(directory, max_segment_bytes=200)
+    assert len(journal) == 10
+    assert [r["lines"][0][1] for r in journal.records()] == list(range(1, 11))
+    assert journal.append(record(11)) == 11
+    journal.close()
+
+
+def test_torn_record_is_truncated_on_reopen(directory):
+    journal = InvoiceJournal(directory)
+    journal.append(record(1))
+    journal.append(record(2))
+    journal.close()
+    path = segments(directory)[-1]
+    size = os.path.getsize(path)
+    with open(path, "ab") as f:
+        f.write(b'{"ts": "2024-01-01 10:0')  # Crash mid-write
+
+    journal = InvoiceJournal(directory)
+    assert len(journal) == 2
+    assert os.path.getsize(path) == size
+    assert journal.append(record(3)) == 3
+    assert journal.get(3)["lines"] == [["Latte", 3, 350]]
+    journal.close()
+
+
+def test_missing_index_is_rebuilt(directory):
+    journal = InvoiceJournal(directory)
+    for n in (1, 2, 3):
+        journal.append(record(n))
+    journal.close()
+    for path in glob.glob(os.path.join(directory, "*.idx")):
+        os.remove(path)
+
+    journal = InvoiceJournal(directory)
+    assert [r["seq"] for r in journal.records()] == [1, 2, 3]
+    journal.close()
+    assert glob.glob(os.path.join(directory, "*.idx"))
+
+
+def test_read_only_leaves_a_live_journal_alone(directory):
+    writer = InvoiceJournal(directory)
+    writer.append(record(1))
+    path = segments(directory)[-1]
+    with open(path, "ab") as f:
+        f.write(b'{"ts": "2024')  # An append in progress
+    size = os.path.getsize(path)
+
+    reader = InvoiceJournal(directory, read_only=True)
+    assert len(reader) == 1
+    assert [r["seq"] for r in reader.records()] == [1]
+    assert os.path.getsize(path) == size
+    with pytest.raises(ValueError):
+        reader.append(record(2))
+    reader.close()
+    writer.close()
+
+
+def test_read_only_on_missing_directory(tmp_path):
+    journal = InvoiceJournal(str(tmp_path / "nowhere"), read_only=True)
+    assert len(journal) == 0
+    assert not os.path.exists(tmp_path / "nowhere")
+
+
+def test_same_key_is_appended_once(directory):
+    journal = InvoiceJournal(directory)
+    assert journal.append(record(1, key="k1")) == 1
+    assert journal.append(record(2, key="k2")) == 2
+    assert journal.append(record(1, key="k1")) == 1
+    assert len(journal) == 2
+    journal.close()
+
+
+def test_key_retry_after_failed_sync(directory, monkeypatch):
+    journal = InvoiceJournal(directory, fsync_every=1)
+
+    def broken_fsync(fd):
+        raise OSError("EIO")
+    monkeypatch.setattr(os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        journal.append(record(1, key="k1"))
+    monkeypatch.undo()
+
+    assert journal.append(record(1, key="k1")) == 1
+    assert journal.unsynced == 0
+    assert len(journal) == 1
+    journal.close()
+
+
+def test_sync_if_due(directory, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(journal_module.time, "monotonic", lambda: now[0])
+    journal = InvoiceJournal(directory, fsync_every=100, fsync_interval=1.0)
+    journal.append(record(1))
+    assert journal.unsynced == 1
+    assert not journal.sync_if_due()  # Not waited long enough yet
+    now[0] += 1.5
+    assert journal.sync_if_due()
+    assert journal.unsynced == 0
+    assert not journal.sync_if_due()  # Nothing left to sync
+    journal.close()
+
+
+def test_render_record():
+    text = render_record(record(2))
+    assert "Latte" in text and "2024-01-01 10:00:00" in text
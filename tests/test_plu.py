@@ -0,0 +1,37 @@
+import pytest
+
+from plu import PLUIndex
+
+CATEGORIES = {
+    "Pizzas": ["Margherita Pizza", "Pepperoni Pizza"],
+    "Beverages": ["Tea", "Coffee", "Latte", "Mocha"],
+}
+
+
+def test_codes_are_prefix_and_position():
+    index = PLUIndex(CATEGORIES)
+    assert index.code_of["Pepperoni Pizza"] == "PZ2"
+    assert index.code_of["Mocha"] == "BV4"
+    assert index.resolve("bv2") == "Coffee"
+
+
+def test_parse_quantities():
+    index = PLUIndex(CATEGORIES)
+    assert index.parse("3*PZ2 BV4, bv1*2") == [("Pepperoni Pizza", 3), ("Mocha", 1), ("Tea", 2)]
+
+
+@pytest.mark.parametrize("text", ["PZ9", "3*PZ2*2", "0*PZ1", "CF1"])
+def test_parse_rejects_bad_tokens(text):
+    with pytest.raises(ValueError):
+        PLUIndex(CATEGORIES).parse(text)
+
+
+def test_codes_unique_when_prefixes_run_out():
+    # Enough same-letter categories to exhaust the two-letter prefixes; the
+    # fallback once made "C7" + 11 and "C71" + 1 both "C711"
+    categories = {f"Cat {i}": [f"item {i}-{j}" for j in range(50)] for i in range(200)}
+    index = PLUIndex(categories)
+    assert len(index.codes) == 200 * 50
+    assert all(index.resolve(code) == item for item, code in index.code_of.items())
+    for code in index.codes:
+        assert code.rstrip("0123456789").isalpha()
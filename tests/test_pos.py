@@ -0,0 +1,180 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from journal import invoice_record
+from pos_client import LocalPosClient, PosClient, RemoteOrder
+from pos_server import PosError, PosServer, PosState
+
+MENU = {"categories": {"Coffee": {"Latte": 3.5, "Espresso": 2.0}, "Cakes": {"Brownie": 4.25}}}
+
+
+def make_state(tmp_path):
+    catalog = tmp_path / "menu.json"
+    catalog.write_text(json.dumps(MENU))
+    return PosState(str(catalog), str(tmp_path / "journal"), str(tmp_path / "cafe.db"))
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = make_state(tmp_path)
+    yield state
+    state.close()
+
+
+@pytest.fixture
+def client(state):
+    return LocalPosClient(state)
+
+
+@pytest.fixture
+def server(tmp_path):
+    loop = asyncio.new_event_loop()
+    server = PosServer(make_state(tmp_path), port=0)  # close() closes the state too
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def shown_invoice(order):
+    """The record CafeApp builds when it shows the invoice for `order`."""
+    return invoice_record(order, datetime.now())
+
+
+# --- Local stand-in ---
+def test_add_and_get(client):
+    order = RemoteOrder(client, "T1")
+    order.add("Latte", 2)
+    order.add("Brownie")
+    state = client.call("get", order="T1")
+    assert state["lines"] == [["Latte", 2, 350], ["Brownie", 1, 425]]
+    assert state["subtotal"] == 1125
+    assert order.total_cents == state["total"]
+
+
+def test_listeners_see_changes(client):
+    order = RemoteOrder(client, "T1")
+    seen = []
+    order.listeners.append(seen.append)
+    order.add("Latte")
+    order.clear()
+    assert seen == ["Latte", None]
+    assert order.undo() is True
+    assert order["Latte"] == 1
+
+
+def test_shared_order_between_tills(client):
+    first = RemoteOrder(client, "T4")
+    second = RemoteOrder(client, "T4")
+    first.add("Espresso")
+    second.sync()
+    assert dict(second.items()) == {"Espresso": 1}
+
+
+def test_refused_requests(client):
+    client.call("open", order="T1")
+    with pytest.raises(PosError, match="Unknown item"):
+        client.call("add", order="T1", item="Tea")
+    with pytest.raises(PosError, match="Invalid quantity"):
+        client.call("add", order="T1", item="Latte", qty="2")
+    with pytest.raises(PosError, match="No open order"):
+        client.call("get", order="T9")
+    with pytest.raises(PosError, match="Unknown operation"):
+        client.call("explode")
+
+
+def test_bad_arguments_are_rejected_before_dispatch(client):
+    client.call("open", order="T1")
+    with pytest.raises(PosError, match="Bad arguments for add"):
+        client.call("add", order="T1")
+    with pytest.raises(PosError, match="Bad arguments for get"):
+        client.call("get", order="T1", colour="red")
+
+
+def test_invoice(client, state):
+    order = RemoteOrder(client, "T1")
+    order.add("Latte", 2)
+    record = shown_invoice(order)
+    result = client.call("invoice", order="T1", expect=record["lines"], key=record["key"])
+    assert result["seq"] == 1
+    assert "Latte" in result["text"]
+    assert state.journal.get(1)["lines"] == [["Latte", 2, 350]]
+    order.sync()
+    assert len(order) == 0
+
+
+def test_invoice_empty_order(client):
+    client.call("open", order="T1")
+    with pytest.raises(PosError, match="empty"):
+        client.call("invoice", order="T1")
+
+
+def test_invoice_refused_if_order_changed_elsewhere(client, state):
+    order = RemoteOrder(client, "T1")
+    order.add("Latte")
+    record = shown_invoice(order)
+    RemoteOrder(client, "T1").add("Brownie")  # Another till
+    with pytest.raises(PosError, match="changed on another till"):
+        client.call("invoice", order="T1", expect=record["lines"], key=record["key"])
+    assert len(state.journal) == 0
+
+
+def test_invoice_retry_returns_first_result(client, state):
+    order = RemoteOrder(client, "T1")
+    order.add("Espresso", 3)
+    record = shown_invoice(order)
+    first = client.call("invoice", order="T1", expect=record["lines"], key=record["key"])
+    again = client.call("invoice", order="T1", expect=record["lines"], key=record["key"])
+    assert again == first
+    assert len(state.journal) == 1
+
+
+# --- Over TCP ---
+def test_server_round_trip(server):
+    client = PosClient(server.host, server.port)
+    try:
+        assert client.call("ping") == "pong"
+        menu = client.call("menu")
+        assert menu["categories"]["Coffee"] == {"Latte": 350, "Espresso": 200}
+        assert client.call("menu", version=menu["version"]) == {"version": menu["version"], "unchanged": True}
+
+        order = RemoteOrder(client, "T2")
+        order.add("Brownie", 2)
+        record = shown_invoice(order)
+        result = client.call("invoice", order="T2", expect=record["lines"], key=record["key"])
+        assert result["seq"] == 1
+        assert "Brownie" in client.call("invoice_text", seq=1)
+    finally:
+        client.close()
+
+
+def test_server_errors(server):
+    client = PosClient(server.host, server.port)
+    try:
+        with pytest.raises(PosError, match="No open order"):
+            client.call("add", order="nope", item="Latte")
+        with pytest.raises(PosError, match="Bad arguments"):
+            client.call("open", table="T1")
+        assert client.call("ping") == "pong"  # The connection survives a refused request
+    finally:
+        client.close()
+
+
+def test_server_malformed_line(server):
+    async def send(line):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(line)
+        reply = json.loads(await reader.readline())
+        writer.close()
+        return reply
+
+    reply = asyncio.run(send(b"not json\n"))
+    assert reply["ok"] is False and "Malformed" in reply["error"]
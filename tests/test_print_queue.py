@@ -0,0 +1,98 @@
+import os
+import threading
+
+import pytest
+from PIL import Image
+
+from print_queue import FileSinkBackend, PrintQueue, SheetLayout
+
+
+class Printed:
+    """on_printed callback that records each sheet's codes and signals once it has."""
+
+    def __init__(self):
+        self.codes = []
+        self.done = threading.Semaphore(0)
+
+    def __call__(self, codes, status):
+        self.codes.append(codes)
+        self.done.release()
+
+    def wait(self, jobs=1, timeout=5):
+        for _ in range(jobs):
+            assert self.done.acquire(timeout=timeout), "print job not reported"
+
+
+def label(code):
+    return code, Image.new("1", (50, 50), 1)
+
+
+@pytest.fixture
+def sink(tmp_path):
+    return FileSinkBackend(str(tmp_path / "labels"))
+
+
+def pngs(sink):
+    return sorted(name for name in os.listdir(sink.directory) if name.endswith(".png"))
+
+
+def test_layout_grid():
+    layout = SheetLayout(columns=3, label_px=100, gap_px=10, margin_px=20, captions=False)
+    sheet = layout.compose([label(str(i)) for i in range(4)])
+    assert sheet.size == (2 * 20 + 3 * 110 - 10, 2 * 20 + 2 * 110 - 10)
+
+
+def test_flush_at_max_labels(sink):
+    printed = Printed()
+    queue = PrintQueue(sink, max_labels=3, window_s=60, on_printed=printed)
+    for i in range(7):
+        queue.add(*label(f"SN-{i}"))
+    printed.wait(2)  # Two full sheets go out without waiting for the window
+    assert printed.codes == [["SN-0", "SN-1", "SN-2"], ["SN-3", "SN-4", "SN-5"]]
+    queue.close(timeout=5)
+    assert printed.codes[-1] == ["SN-6"]
+    assert len(pngs(sink)) == 3
+
+
+def test_flush_at_window(sink):
+    printed = Printed()
+    queue = PrintQueue(sink, max_labels=12, window_s=0.1, on_printed=printed)
+    queue.add(*label("A"))
+    queue.add(*label("B"))
+    printed.wait()
+    assert printed.codes == [["A", "B"]]
+    queue.close(timeout=5)
+    assert len(pngs(sink)) == 1
+
+
+def test_flush_on_close(sink):
+    printed = []
+    queue = PrintQueue(sink, max_labels=12, window_s=60, on_printed=lambda codes, status: printed.append(codes))
+    queue.add(*label("LAST"))
+    queue.close(timeout=5)
+    assert printed == [["LAST"]]
+    assert len(pngs(sink)) == 1
+    with pytest.raises(RuntimeError):
+        queue.add(*label("LATE"))
+
+
+def test_explicit_flush(sink):
+    printed = Printed()
+    queue = PrintQueue(sink, max_labels=12, window_s=60, on_printed=printed)
+    queue.add(*label("A"))
+    queue.flush()
+    printed.wait()
+    queue.close(timeout=5)
+    assert len(pngs(sink)) == 1
+
+
+def test_failed_job_is_reported():
+    class BrokenPrinter:
+        def submit(self, image, title):
+            raise OSError("paper jam")
+
+    statuses = []
+    queue = PrintQueue(BrokenPrinter(), window_s=60, on_printed=lambda codes, status: statuses.append(status))
+    queue.add(*label("A"))
+    queue.close(timeout=5)
+    assert statuses == ["Print error: paper jam"]
@@ -0,0 +1,93 @@
+import os
+import sys
+
+import pytest
+
+from scan_reader import ByteRing, FdSource, LineFramer, ScanReader, open_fake_scanner
+
+needs_pty = pytest.mark.skipif(sys.platform == "win32", reason="fake scanner needs a POSIX pty")
+
+
+# --- ByteRing ---
+def test_ring_wraps_around():
+    ring = ByteRing(8)
+    assert ring.write(b"abcdef") == 0
+    assert ring.read(4) == b"abcd"
+    assert ring.write(b"ghijk") == 0  # Wraps past the end of the array
+    assert len(ring) == 7
+    assert ring.find_any(b"j") == 5
+    assert ring.read(7) == b"efghijk"
+    assert len(ring) == 0
+
+
+def test_ring_reports_overflow():
+    ring = ByteRing(4)
+    assert ring.write(b"abcdef") == 2
+    assert ring.read(10) == b"abcd"
+
+
+# --- LineFramer ---
+@pytest.mark.parametrize("end", [b"\r", b"\n", b"\r\n"])
+def test_line_endings(end):
+    framer = LineFramer()
+    assert framer.feed(b"SN-1" + end + b"SN-2" + end) == ["SN-1", "SN-2"]
+
+
+def test_code_split_across_reads():
+    framer = LineFramer()
+    assert framer.feed(b"AA:BB:") == []
+    assert framer.feed(b"CC\r\nSN") == ["AA:BB:CC"]
+    assert framer.feed(b"-9\n") == ["SN-9"]
+
+
+def test_crlf_split_across_reads():
+    framer = LineFramer()
+    assert framer.feed(b"SN-1\r") == ["SN-1"]
+    assert framer.feed(b"\nSN-2\r") == ["SN-2"]  # The stray LF is a blank line, not a code
+
+
+def test_overlong_frame_is_discarded():
+    framer = LineFramer(capacity=8)
+    assert framer.feed(b"1234567\r") == ["1234567"]  # Just fits with its terminator
+    assert framer.feed(b"0123456789ABCDEF\rOK\r") == ["OK"]
+
+
+def test_overlong_frame_split_across_reads():
+    framer = LineFramer(capacity=8)
+    assert framer.feed(b"01234567") == []
+    assert framer.feed(b"89AB") == []
+    assert framer.feed(b"CD\nNEXT\n") == ["NEXT"]
+
+
+# --- ScanReader with a fake scanner ---
+@pytest.fixture
+def scanner():
+    scanner_fd, reader_fd = open_fake_scanner()
+    reader = ScanReader(FdSource(reader_fd), stop_check_s=0.05)
+    reader.start()
+    yield scanner_fd, reader
+    reader.stop(timeout=2)
+    try:
+        os.close(scanner_fd)
+    except OSError:
+        pass
+
+
+@needs_pty
+def test_reader_delivers_codes_in_order(scanner):
+    scanner_fd, reader = scanner
+    os.write(scanner_fd, b"SN-0001\r\nSN-0002\r\nAA:BB:")
+    os.write(scanner_fd, b"CC:DD:EE:FF\nSN-0003\r")
+    expected = ["SN-0001", "SN-0002", "AA:BB:CC:DD:EE:FF", "SN-0003"]
+    assert [reader.codes.get(timeout=2) for _ in expected] == expected
+
+
+@needs_pty
+def test_reader_reports_disconnect(scanner):
+    scanner_fd, reader = scanner
+    errors = []
+    reader.on_error = errors.append
+    os.close(scanner_fd)
+    reader.thread.join(timeout=2)
+    assert isinstance(reader.error, EOFError)
+    assert errors == [reader.error]
@@ -0,0 +1,41 @@
+import sqlite3
+
+from store import OrderStore
+
+RECORD = {"key": "k1", "ts": "2024-01-01 10:00:00", "tax_bp": 800, "lines": [["Latte", 2, 350], ["Brownie", 1, 425]]}
+
+
+def test_invoice_saved(tmp_path):
+    store = OrderStore(str(tmp_path / "cafe.db"))
+    store.save_invoice(RECORD, 1)
+    store.flush()
+    assert store.recent_invoices() == [(1, 1, "2024-01-01 10:00:00", 1215)]
+    store.close()
+
+
+def test_same_key_is_stored_once(tmp_path):
+    store = OrderStore(str(tmp_path / "cafe.db"))
+    store.save_invoice(RECORD, 1)
+    store.save_invoice(RECORD, 1)  # Same batch
+    store.flush()
+    store.save_invoice(RECORD, 1)  # Later batch
+    store.flush()
+    assert len(store.recent_invoices()) == 1
+    assert store.item_sales("Latte") == (2, 700)  # No duplicate order lines either
+    store.close()
+
+
+def test_old_database_gains_key_column(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE invoices (id INTEGER PRIMARY KEY AUTOINCREMENT, order_id INTEGER NOT NULL, "
+                 "journal_seq INTEGER, created_at TEXT NOT NULL, subtotal_cents INTEGER NOT NULL, "
+                 "tax_cents INTEGER NOT NULL, total_cents INTEGER NOT NULL)")
+    conn.close()
+    store = OrderStore(path)
+    store.save_invoice(RECORD, 1)
+    store.save_invoice(RECORD, 1)
+    store.save_invoice(dict(RECORD, key=None), 2)  # Keyless records are never merged
+    store.flush()
+    assert [row[1] for row in store.recent_invoices()] == [2, 1]
+    store.close()
@@ -0,0 +1,73 @@
+import tkinter as tk
+
+# --- Toast colours (background, foreground) ---
+TOAST_COLORS = {
+    "info": ("#323232", "#FFFFFF"),
+    "warning": ("#8A6D00", "#FFFFFF"),
+    "error": ("#A12622", "#FFFFFF"),
+}
+
+
+class Toaster:
+    """Non-modal notifications drawn inside the main window.
+
+    A toast is a label placed over the bottom-right corner of the root window,
+    so it never takes focus or blocks the event loop. It fades out after
+    `duration_ms`; item-added toasts arriving while one is on screen are
+    batched into a single "Added N items" message.
+    """
+
+    def __init__(self, root, duration_ms=1500, fade_ms=300, fade_steps=6):
+        self.root = root
+        self.duration_ms = duration_ms
+        self.fade_steps = fade_steps
+        self.fade_step_ms = max(fade_ms // fade_steps, 1)
+        self.label = tk.Label(root, font=("Segoe UI", 10), padx=12, pady=6)
+        self.colors = TOAST_COLORS["info"]
+        self.pending = None
+        self.batch_items = 0
+        self.batch_lines = 0
+
+    def show(self, message, kind="info"):
+        """Show `message`, replacing any toast currently on screen."""
+        self.batch_items = self.batch_lines = 0
+        self._show(message, kind)
+
+    def item_added(self, item_name, qty):
+        """Report an item add, merged with any other adds still on screen."""
+        self.batch_items += qty
+        self.batch_lines += 1
+        if self.batch_lines == 1:
+            message = f"Added {qty} x {item_name}"
+        else:
+            message = f"Added {self.batch_items} items (last: {qty} x {item_name})"
+        self._show(message, "info")
+
+    def _show(self, message, kind):
+        bg, fg = TOAST_COLORS[kind]
+        self.colors = (bg, fg)
+        self.label.config(text=message, bg=bg, fg=fg)
+        self.label.place(relx=1.0, rely=1.0, x=-12, y=-12, anchor="se")
+        self.label.lift()
+        self._schedule(self.duration_ms, self._fade, 0)
+
+    def _fade(self, step):
+        if step >= self.fade_steps:
+            self.label.place_forget()
+            self.pending = None
+            self.batch_items = self.batch_lines = 0
+            return
+        bg, fg = self.colors
+        self.label.config(fg=self._blend(fg, bg, (step + 1) / self.fade_steps))
+        self._schedule(self.fade_step_ms, self._fade, step + 1)
+
+    def _schedule(self, delay_ms, callback, *args):
+        if self.pending is not None:
+            self.root.after_cancel(self.pending)
+        self.pending = self.root.after(delay_ms, callback, *args)
+
+    def _blend(self, start, end, fraction):
+        r1, g1, b1 = self.root.winfo_rgb(start)
+        r2, g2, b2 = self.root.winfo_rgb(end)
+        mix = lambda a, b: int(a + (b - a) * fraction) >> 8
+        return f"#{mix(r1, r2):02x}{mix(g1, g2):02x}{mix(b1, b2):02x}"